@@ -1,10 +1,11 @@
 from logging.handlers import RotatingFileHandler
 import time
+STARTUP_TIME = time.perf_counter()  # Taken before the API client imports for the tick budget
 from functools import wraps
-import openai
 import random
 import os
 import tweepy
+import json
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
@@ -18,8 +19,16 @@ logging.getLogger().addHandler(console_handler)
 
 # Load environment variables from .env file
 load_dotenv()
-from src.memory.tweet_memory import TweetMemory
+from src.memory.tweet_memory import TweetMemory, tweet_digest
+from src.memory.history_import import HistoryImporter
 from src.personality.personality_manager import PersonalityManager
+from src.personality.context_manager import ContextManager
+from src.personality.engagement_tracker import EngagementTracker
+from src.simulation.clock import SystemClock
+from src.profiling.cycle_profiler import CycleProfiler, NullProfiler
+from src.usage.ledger import UsageLedger, NORMAL, MINIMAL
+from src.models.model_router import ModelRouter
+from src.coordination.posting_lease import PostingLease
 
 # Set up logging
 def setup_logging():
@@ -31,6 +40,20 @@ def setup_logging():
 
 logger = setup_logging()
 
+# All waits and timestamps go through this clock so simulations can swap in a virtual one
+clock = SystemClock()
+
+# Replaced by a CycleProfiler when running with --profile
+profiler = NullProfiler()
+
+def model_tier(tier, default):
+    """Models for a tier from MODEL_TIER_<TIER>, in order of preference"""
+    models = [model.strip() for model in os.getenv(f"MODEL_TIER_{tier.upper()}", default).split(',')]
+    models = [model for model in models if model]
+    if not models:
+        raise EnvironmentError(f"MODEL_TIER_{tier.upper()} lists no models")
+    return models
+
 CONFIG = {
     'sleep_duration': 10800,  # 3 hours between tweets
     'max_retries': 3,
@@ -41,9 +64,47 @@ CONFIG = {
     'rate_limit_wait': 900,  # 15 minutes wait on rate limit
     'rate_limit_reset_time': None,  # Will store the next reset time
     'tweets_remaining': None,  # Will store remaining tweet quota
-    'min_tweets_threshold': 5  # Minimum tweets remaining before waiting
+    'min_tweets_threshold': 5,  # Minimum tweets remaining before waiting
+    'tweet_memory_size': 50000,  # Posted tweets remembered for duplicate checks (24-40 bytes each)
+    'tweet_memory_store_text': False,  # Digests suffice for checks; text is only for inspection
+    'engagement_window_days': 7,  # How long posted tweets feed mood changes
+    'engagement_max_batches': 3,  # get_tweets calls (100 ids each) per refresh
+    'engagement_refresh_interval': 900,  # Minimum seconds between metric refreshes
+    'state_file': 'autotweet_state.json',  # Persisted between --tick runs
+    'wait_for_quota': True,  # Sleep through low quota instead of reporting it
+    'tick_startup_budget': 10,  # Seconds allowed before a tick decides whether to post
+    'failed_tweets_log': 'failed_tweets.log',
+    'profile_dir': 'profiles',  # Rotating output directory for --profile
+    'profile_snapshot_every': 10,  # Cycles between tracemalloc snapshots
+    'profile_keep_cycles': 20,  # Cycle profiles kept before rotating out
+    'bootstrap_page_delay': 1,  # Seconds between timeline pages during --bootstrap
+    'daily_token_budget': int(os.getenv('OPENAI_DAILY_TOKEN_BUDGET') or 0) or None,  # None disables the governor
+    'token_budget_soft_limit': 0.8,  # Fraction of the budget where generation starts to degrade
+    # Models per kind of call, in order of preference; override with e.g. MODEL_TIER_DRAFT="a,b"
+    'model_tiers': {
+        tier: model_tier(tier, default)
+        for tier, default in [
+            ('draft', 'gpt-3.5-turbo,gpt-4'),
+            ('polish', 'gpt-4,gpt-3.5-turbo'),
+            ('probe', 'gpt-3.5-turbo,gpt-4')
+        ]
+    },
+    'model_max_p95_latency': 20,  # Seconds before a model is considered too slow
+    'model_max_error_rate': 0.5,  # Share of recent calls failing before failing over
+    # Rewrite accepted drafts on the polish tier; off by default since it adds a gpt-4 call per tweet
+    'polish_drafts': os.getenv('POLISH_DRAFTS', '').lower() in ('1', 'true', 'yes'),
+    'coordination_db': os.getenv('COORDINATION_DB', 'autotweet.db'),  # Shared by every instance on this host
+    'account_id': os.getenv('ACCESS_TOKEN', '').split('-')[0] or 'default',  # Access tokens start with the user id
+    'lease_ttl': 300,  # Seconds a posting lease is held without renewal
+    'draft_queue_size': 1,  # Drafts kept ready for the lease holder; raise when running several generators
+    'draft_max_age': 86400  # Seconds before an unposted draft is discarded
 }
 
+# Exit codes for --tick runs
+EXIT_OK = 0  # Posted, or no post was due
+EXIT_FAILED = 1
+EXIT_DEFERRED = 75  # Post due but quota is low; try again on a later tick (EX_TEMPFAIL)
+
 def retry_with_backoff(max_retries=5, backoff_factor=3):
     def decorator(func):
         @wraps(func)
@@ -55,12 +116,52 @@ def retry_with_backoff(max_retries=5, backoff_factor=3):
                 except Exception as e:
                     wait_time = (backoff_factor ** retries) * 60  # Convert to minutes
                     logger.error(f"Error: {e}. Retrying in {wait_time//60} minutes")
-                    time.sleep(wait_time)
+                    clock.sleep(wait_time, 'retry')
                     retries += 1
             raise Exception(f"Failed after {max_retries} retries")
         return wrapper
     return decorator
 
+# OpenAI token usage and the daily spend governor
+ledger = UsageLedger(daily_budget=CONFIG['daily_token_budget'], soft_limit=CONFIG['token_budget_soft_limit'])
+
+# Picks a model per tier from rolling latency and error rates
+router = ModelRouter(
+    CONFIG['model_tiers'],
+    max_p95_latency=CONFIG['model_max_p95_latency'],
+    max_error_rate=CONFIG['model_max_error_rate']
+)
+
+# Only the holder of this account's lease may post; opened on first use so
+# importing this module never creates the database
+coordinator = None
+
+def get_coordinator():
+    global coordinator
+    if coordinator is None:
+        coordinator = PostingLease(CONFIG['coordination_db'], account=CONFIG['account_id'], ttl=CONFIG['lease_ttl'])
+    return coordinator
+
+def chat_completion(call_site, tier, persona=None, **kwargs):
+    """openai.ChatCompletion.create on the best model of a tier, recording latency and token usage"""
+    last_error = None
+    for model in router.candidates(tier):
+        started = clock.now()
+        try:
+            # A hanging model fails over once it is twice as slow as a healthy p95, and the
+            # timeout counts as an error, instead of stalling the cycle on the client default
+            response = openai.ChatCompletion.create(
+                model=model, request_timeout=2 * CONFIG['model_max_p95_latency'], **kwargs)
+        except Exception as e:
+            router.record(model, (clock.now() - started).total_seconds(), False)
+            logger.warning(f"{model} failed for {call_site}, trying next model: {str(e)}")
+            last_error = e
+            continue
+        router.record(model, (clock.now() - started).total_seconds(), True)
+        ledger.record(call_site, response.get('usage'), clock.now().date().isoformat(), persona=persona)
+        return response
+    raise last_error
+
 def validate_secrets():
     required_vars = ['API_KEY', 'API_SECRET', 'ACCESS_TOKEN', 'ACCESS_SECRET', 'BEARER_TOKEN', 'OPENAI_API_KEY']
     missing = [var for var in required_vars if not os.getenv(var)]
@@ -71,7 +172,7 @@ def check_rate_limits():
     try:
         # Get rate limit status for user tweets
         response = client.get_me()
-        rate_limits = response.rate_limit
+        rate_limits = getattr(response, 'rate_limit', None)
         
         if hasattr(rate_limits, 'remaining'):
             CONFIG['tweets_remaining'] = rate_limits.remaining
@@ -80,10 +181,13 @@ def check_rate_limits():
             logger.info(f"Rate limits - Remaining: {CONFIG['tweets_remaining']}, Reset time: {CONFIG['rate_limit_reset_time']}")
             
             if CONFIG['tweets_remaining'] is not None and CONFIG['tweets_remaining'] < CONFIG['min_tweets_threshold']:
-                wait_time = (CONFIG['rate_limit_reset_time'] - datetime.now()).total_seconds()
+                wait_time = (CONFIG['rate_limit_reset_time'] - clock.now()).total_seconds()
                 if wait_time > 0:
+                    if not CONFIG['wait_for_quota']:
+                        logger.warning(f"Low on tweet quota ({CONFIG['tweets_remaining']} remaining). Resets in {wait_time/60:.1f} minutes.")
+                        return False
                     logger.warning(f"Low on tweet quota ({CONFIG['tweets_remaining']} remaining). Waiting {wait_time/60:.1f} minutes for reset.")
-                    time.sleep(wait_time + 60)  # Add 1 minute buffer
+                    clock.sleep(wait_time + 60, 'quota')  # Add 1 minute buffer
                     return check_rate_limits()
         
         return True
@@ -91,10 +195,12 @@ def check_rate_limits():
     except Exception as e:
         logger.error(f"Rate limit check failed: {str(e)}")
         # If we can't check rate limits, wait for the default time
-        time.sleep(CONFIG['rate_limit_wait'])
+        if CONFIG['wait_for_quota']:
+            clock.sleep(CONFIG['rate_limit_wait'], 'quota')
         return False
 
 def health_check():
+    connect_clients()
     try:
         validate_secrets()
         
@@ -107,14 +213,18 @@ def health_check():
         if test_response and test_response.data:
             logger.info(f"Successfully connected to Twitter as @{test_response.data.username}")
             
-        # Test OpenAI API connection
-        test_completion = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": "test"}],
-            max_tokens=5
-        )
-        if test_completion:
-            logger.info("Successfully connected to OpenAI API")
+        # Test OpenAI API connection, unless the daily token budget is running low
+        if ledger.degradation(clock.now().date().isoformat()) != NORMAL:
+            logger.info("Skipping OpenAI health probe to save token budget")
+        else:
+            test_completion = chat_completion(
+                'health_check',
+                'probe',
+                messages=[{"role": "user", "content": "test"}],
+                max_tokens=5
+            )
+            if test_completion:
+                logger.info("Successfully connected to OpenAI API")
             
         return True
         
@@ -154,18 +264,41 @@ if not all([api_key, api_secret, access_token, access_secret, bearer_token, open
 else:
     logger.info("All secrets loaded successfully.")
 
-# Set OpenAI API key
-openai.api_key = openai_api_key
-
-# Initialize Tweepy client with increased timeout
-client = tweepy.Client(
-    bearer_token=bearer_token,
-    consumer_key=api_key,
-    consumer_secret=api_secret,
-    access_token=access_token,
-    access_token_secret=access_secret,
-    wait_on_rate_limit=True  # Automatically wait for rate limits
-)
+# API clients are built by connect_clients() on first use, so a --tick run that
+# is not due decides without importing openai or constructing any client
+openai = None
+client = None
+read_client = None
+
+def connect_clients():
+    global openai, client, read_client
+    if openai is None:
+        import openai as openai_module
+        openai = openai_module
+        openai.api_key = openai_api_key
+
+    if client is None:
+        # Initialize Tweepy client with increased timeout
+        client = tweepy.Client(
+            bearer_token=bearer_token,
+            consumer_key=api_key,
+            consumer_secret=api_secret,
+            access_token=access_token,
+            access_token_secret=access_secret,
+            wait_on_rate_limit=True  # Automatically wait for rate limits
+        )
+
+    if read_client is None:
+        # Background reads (engagement metrics, history import) handle 429s themselves
+        # instead of blocking the posting cycle until the window resets
+        read_client = tweepy.Client(
+            bearer_token=bearer_token,
+            consumer_key=api_key,
+            consumer_secret=api_secret,
+            access_token=access_token,
+            access_token_secret=access_secret,
+            wait_on_rate_limit=False
+        )
 
 # Combined sources for tweet prompts
 all_prompts = {
@@ -313,10 +446,37 @@ def clean_tweet_text(tweet):
     
     return tweet
 
+def truncate_tweet(tweet):
+    # Handle length constraints
+    if len(tweet) > 280:
+        logger.warning("Tweet exceeds 280 characters. Truncating...")
+        sentences = tweet.split('. ')
+        truncated_tweet = ""
+        for sentence in sentences:
+            if len(truncated_tweet) + len(sentence) + 2 <= 280:
+                truncated_tweet += sentence + ". "
+            else:
+                break
+        tweet = truncated_tweet.strip()
+        logger.info(f"Truncated tweet: {tweet}")
+    
+    return tweet
+
 class AutoTweet:
     def __init__(self):
-        self.tweet_memory = TweetMemory()
+        connect_clients()
+        self.tweet_memory = TweetMemory(
+            max_memory=CONFIG['tweet_memory_size'],
+            store_text=CONFIG['tweet_memory_store_text']
+        )
         self.personality = PersonalityManager()
+        self.context = ContextManager(engagement_window_days=CONFIG['engagement_window_days'])
+        self.engagement = EngagementTracker(
+            read_client, self.context,
+            max_batches=CONFIG['engagement_max_batches'],
+            refresh_interval=CONFIG['engagement_refresh_interval'],
+            rate_limit_wait=CONFIG['rate_limit_wait']
+        )
         self.last_tweet_time = None
         self.recent_prompts = []  # Store last 10 used prompts
         self.recent_phrases = {}  # Store phrase frequency
@@ -324,6 +484,11 @@ class AutoTweet:
         self.phrase_cooldown = 20  # Number of tweets before a phrase can be reused
         self.all_prompts = all_prompts  # Store reference to global prompts
         self.common_phrases = []  # Removed all condescending phrases
+        self.rejection_counts = {}  # Rejected drafts by reason
+        self.bootstrap_progress = {}  # Resume point for --bootstrap
+        self.draft_mood = None  # Mood the last generated tweet was written in
+        self.last_tweet_mood = None  # Mood of the last tweet actually posted
+        self.failed_drafts = 0  # Drafts since the last accepted tweet, across retried cycles
 
     def pick_prompt(self):
         # Get all available prompts
@@ -396,31 +561,112 @@ class AutoTweet:
         if self.last_tweet_time is None:
             return True
         
-        elapsed = datetime.now() - self.last_tweet_time
+        elapsed = clock.now() - self.last_tweet_time
         return elapsed.total_seconds() >= CONFIG['sleep_duration']
 
+    def refresh_engagement(self):
+        """Fetch metrics for recent tweets; mood falls back to time-based changes on failure"""
+        try:
+            with profiler.stage('engagement'):
+                metrics = self.engagement.refresh(clock.now())
+            logger.info(f"Engagement: {metrics['sampled_tweets']} tweets sampled, "
+                        f"avg interactions {metrics['average_interactions']:.1f}")
+            return metrics
+        except Exception as e:
+            logger.warning(f"Engagement refresh failed: {str(e)}")
+            return None
+
+    def memory_sizes(self):
+        """Sizes of the structures that grow over a long run"""
+        return {
+            'interaction_history': len(self.personality.interaction_history),
+            'recent_phrases': len(self.recent_phrases),
+            'recent_prompts': len(self.recent_prompts),
+            'tweet_memory': len(self.tweet_memory),
+            'engagement_index': len(self.context.engagement_index)
+        }
+
+    def get_state(self):
+        """Snapshot of what the next --tick run needs to carry on from this one"""
+        reset_time = CONFIG['rate_limit_reset_time']
+        return {
+            'last_tweet_time': self.last_tweet_time.isoformat() if self.last_tweet_time else None,
+            'recent_prompts': self.recent_prompts,
+            'recent_phrases': self.recent_phrases,
+            'tweet_digests': list(self.tweet_memory.iter_digests()),
+            'engagement': self.context.to_dict(),
+            'engagement_refresh': self.engagement.to_dict(),
+            'personality': {
+                'current_mood': self.personality.current_mood,
+                'interaction_count': self.personality.interaction_count,
+                'last_mood_change': self.personality.last_mood_change,
+                'mood_duration': self.personality.mood_duration
+            },
+            'quota': {
+                'tweets_remaining': CONFIG['tweets_remaining'],
+                'rate_limit_reset_time': reset_time.isoformat() if isinstance(reset_time, datetime) else None
+            },
+            'bootstrap': self.bootstrap_progress,
+            'usage': ledger.to_dict(),
+            'models': router.to_dict()
+        }
+
+    def restore_state(self, state):
+        """Restore a snapshot produced by get_state"""
+        if state.get('last_tweet_time'):
+            self.last_tweet_time = datetime.fromisoformat(state['last_tweet_time'])
+        self.recent_prompts = state.get('recent_prompts', self.recent_prompts)
+        self.recent_phrases = state.get('recent_phrases', self.recent_phrases)
+        self.bootstrap_progress = state.get('bootstrap', self.bootstrap_progress)
+        if 'usage' in state:
+            ledger.load_dict(state['usage'])
+        router.load_dict(state.get('models', {}))
+        for digest in state.get('tweet_digests', []):
+            self.tweet_memory.add_digest(digest)
+        self.context.load_dict(state.get('engagement', {}))
+        self.engagement.load_dict(state.get('engagement_refresh', {}))
+
+        personality = state.get('personality', {})
+        if personality.get('current_mood') in self.personality.moods:
+            self.personality.current_mood = personality['current_mood']
+            self.personality.interaction_count = personality['interaction_count']
+            self.personality.last_mood_change = personality['last_mood_change']
+            self.personality.mood_duration = personality['mood_duration']
+
+        restore_quota(state)
+
     def generate_tweet(self):
         try:
             max_attempts = 5
+            if ledger.degradation(clock.now().date().isoformat()) == MINIMAL:
+                logger.warning("Daily token budget exhausted, generating a single candidate")
+                max_attempts = 1
             attempts = 0
             
             while attempts < max_attempts:
                 prompt = self.pick_prompt()
                 logger.info(f"Selected prompt: {prompt}")
-                tweet = self._generate_single_tweet(prompt)
+                # Charged as 'retry' whenever an earlier draft failed, including drafts
+                # from cycles that retry_with_backoff is re-running
+                call_site = 'generation' if self.failed_drafts == 0 else 'retry'
+                self.failed_drafts += 1
+                tweet = self._generate_single_tweet(prompt, call_site)
                 
                 # Check if tweet passes all our filters
-                if (tweet and 
-                    not self.tweet_memory.check_similarity(tweet) and 
-                    self.check_phrase_frequency(tweet)):
+                rejection = self._rejection_reason(tweet)
+                if rejection is None:
+                    self.failed_drafts = 0
+                    tweet = self._polish_tweet(tweet)
                     self.tweet_memory.add_tweet(tweet)
-                    self.personality.update_mood()
+                    self.draft_mood = self.personality.current_mood
+                    self.personality.update_mood(self.refresh_engagement())
                     return tweet
                 
+                self.rejection_counts[rejection] = self.rejection_counts.get(rejection, 0) + 1
                 attempts += 1
                 if attempts < max_attempts:
-                    logger.info(f"Tweet rejected, attempt {attempts}/{max_attempts}")
-                    time.sleep(2)  # Brief pause between attempts
+                    logger.info(f"Tweet rejected ({rejection}), attempt {attempts}/{max_attempts}")
+                    clock.sleep(2, 'generation')  # Brief pause between attempts
             
             raise Exception("Failed to generate acceptable tweet after maximum attempts")
             
@@ -428,7 +674,48 @@ class AutoTweet:
             logger.error(f"Error during tweet generation: {str(e)}")
             raise
 
-    def _generate_single_tweet(self, prompt):
+    def _rejection_reason(self, tweet):
+        if not tweet:
+            return 'generation_failed'
+        if self.tweet_memory.check_similarity(tweet):
+            return 'duplicate'
+        if not self.check_phrase_frequency(tweet):
+            return 'phrase_cooldown'
+        return None
+
+    def _polish_tweet(self, draft):
+        """Final pass on the polish tier; keeps the draft if polishing fails or is skipped"""
+        if not CONFIG['polish_drafts'] or ledger.degradation(clock.now().date().isoformat()) == MINIMAL:
+            return draft
+        
+        try:
+            with profiler.stage('polish'):
+                response = chat_completion(
+                    'polish',
+                    'polish',
+                    persona=self.personality.current_mood,
+                    messages=[
+                        {"role": "system", "content": (
+                            "Sharpen this tweet. Keep its meaning, stance and cold clinical voice. "
+                            "Start directly with the statement, no introductory phrases, no quotes. "
+                            "Reply with the tweet only, under 280 characters."
+                        )},
+                        {"role": "user", "content": draft}
+                    ],
+                    max_tokens=90,
+                    temperature=0.4
+                )
+            polished = truncate_tweet(clean_tweet_text(response['choices'][0]['message']['content'].strip()))
+        except Exception as e:
+            logger.warning(f"Polish failed, keeping draft: {str(e)}")
+            return draft
+        
+        if not polished or self.tweet_memory.check_similarity(polished):
+            return draft
+        logger.info(f"Polished tweet: {polished}")
+        return polished
+
+    def _generate_single_tweet(self, prompt, call_site='generation'):
         try:
             logger.info(f"Generating tweet with prompt: {prompt}")
             
@@ -466,15 +753,18 @@ class AutoTweet:
                 "START DIRECTLY with your brutal, honest, unrelenting statement."
             )
             
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=70,
-                temperature=0.9
-            )
+            with profiler.stage('openai'):
+                response = chat_completion(
+                    call_site,
+                    'draft',
+                    persona=personality['mood'],
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=70,
+                    temperature=0.9
+                )
             
             tweet = response['choices'][0]['message']['content'].strip()
             
@@ -487,70 +777,143 @@ class AutoTweet:
             tweet = clean_tweet_text(tweet)
             logger.info(f"Generated tweet: {tweet}")
             
-            # Handle length constraints
-            if len(tweet) > 280:
-                logger.warning("Tweet exceeds 280 characters. Truncating...")
-                sentences = tweet.split('. ')
-                truncated_tweet = ""
-                for sentence in sentences:
-                    if len(truncated_tweet) + len(sentence) + 2 <= 280:
-                        truncated_tweet += sentence + ". "
-                    else:
-                        break
-                tweet = truncated_tweet.strip()
-                logger.info(f"Truncated tweet: {tweet}")
-            
-            return tweet
+            return truncate_tweet(tweet)
             
         except Exception as e:
             logger.error(f"Error generating single tweet: {str(e)}")
             return None
 
+    def _claim_posting_slot(self):
+        """Take the account's lease if this window is still open; returns the fencing token or None"""
+        coordinator = get_coordinator()
+        now = clock.now().timestamp()
+        fencing_token = coordinator.acquire(now)
+        if fencing_token is None:
+            logger.info("Another instance holds the posting lease. Skipping this post.")
+            return None
+        last_post = coordinator.last_post_time()  # Includes posts still in flight
+        if last_post is not None and now - last_post < CONFIG['sleep_duration']:
+            logger.info("Another instance already posted in this window. Skipping this post.")
+            coordinator.release(fencing_token)
+            return None
+        return fencing_token
+
+    def _queue_draft(self):
+        """Generate a candidate for the shared queue unless the window is used or the queue is full"""
+        coordinator = get_coordinator()
+        now = clock.now().timestamp()
+        coordinator.prune_drafts(now - CONFIG['draft_max_age'])
+        last_post = coordinator.last_post_time()
+        if last_post is not None and now - last_post < CONFIG['sleep_duration']:
+            logger.info("A tweet was already posted in this window. Skipping generation.")
+            return False
+        if coordinator.queued_drafts() < CONFIG['draft_queue_size']:
+            with profiler.stage('generate'):
+                tweet = self.generate_tweet()
+            coordinator.queue_draft(f"{tweet_digest(tweet):016x}", tweet, self.draft_mood, now)
+        return True
+
+    def _post_exclusively(self, idempotency_key, tweet, fencing_token):
+        """Post under a claimed lease; None if the lease was lost or the tweet is already posted"""
+        coordinator = get_coordinator()
+        # Renew after generation; a different token means the lease lapsed meanwhile
+        if coordinator.acquire(clock.now().timestamp()) != fencing_token:
+            logger.warning("Posting lease expired before posting. Skipping this post.")
+            return None
+        # The pending row is written before create_tweet, so a crash mid-post can skip a
+        # window but never lets another instance post the same slot again
+        if not coordinator.begin_post(idempotency_key, fencing_token, clock.now().timestamp()):
+            logger.info("This tweet was already posted by another instance. Skipping.")
+            return None
+
+        try:
+            with profiler.stage('post'):
+                response = client.create_tweet(text=tweet)
+        except tweepy.TweepyException as e:
+            status_code = getattr(getattr(e, 'response', None), 'status_code', None)
+            if status_code is not None and (400 <= status_code < 500 or status_code == 503):
+                coordinator.abandon_post(idempotency_key)  # Rejected outright, so nothing was posted
+            raise
+
+        coordinator.complete_post(idempotency_key, response.data['id'] if response and response.data else None)
+        return response
+
     @retry_with_backoff(max_retries=5, backoff_factor=3)
-    def post_tweet(self):
+    def post_tweet(self, retry=True):
+        """Generate and post one tweet; with retry=False a 429 or 5xx returns None instead of waiting"""
         try:
             if not self.check_rate_limit():
                 wait_time = CONFIG['sleep_duration']
                 logger.info(f"Waiting {wait_time//3600} hours before next tweet...")
-                time.sleep(wait_time)
+                clock.sleep(wait_time, 'post_interval')
                 
             # Check rate limits before attempting to tweet
             if not check_rate_limits():
                 return None
                 
-            tweet = self.generate_tweet()
+            # Any instance may generate; the draft waits in the queue for the lease holder
+            if not self._queue_draft():
+                return None
+            fencing_token = self._claim_posting_slot()
+            if fencing_token is None:
+                return None
+            try:
+                draft = get_coordinator().next_draft()
+                if draft is None:
+                    return None
+                idempotency_key, tweet, mood = draft
             
-            # Add delay before posting
-            time.sleep(10)
+                # Add delay before posting
+                clock.sleep(10, 'post_delay')
             
-            try:
-                response = client.create_tweet(text=tweet)
-                logger.info(f"Tweet posted successfully: {tweet}")
-                self.last_tweet_time = datetime.now()
-                return response
+                try:
+                    response = self._post_exclusively(idempotency_key, tweet, fencing_token)
+                    if response is None:
+                        return None
+                    logger.info(f"Tweet posted successfully: {tweet}")
+                    self.last_tweet_time = clock.now()
+                    self.last_tweet_mood = mood
+                    self.tweet_memory.add_tweet(tweet)  # The draft may come from another instance
+                    cost = ledger.record_post(self.last_tweet_time.date().isoformat())
+                    logger.info(f"Tweet cost {cost['prompt_tokens']} prompt + {cost['completion_tokens']} "
+                                f"completion tokens over {cost['calls']} OpenAI calls")
+                    if response and response.data:
+                        self.context.add_interaction(tweet, tweet_id=response.data['id'],
+                                                     timestamp=self.last_tweet_time)
+                    return response
                 
-            except tweepy.TweepyException as e:
-                if hasattr(e, 'response'):
-                    if e.response.status_code == 429:  # Rate limit exceeded
-                        logger.warning("Rate limit exceeded while posting tweet")
-                        if not check_rate_limits():  # This will handle the waiting
-                            return None
-                        return self.post_tweet()  # Try again after waiting
+                except tweepy.TweepyException as e:
+                    if hasattr(e, 'response'):
+                        if e.response.status_code == 429:  # Rate limit exceeded
+                            logger.warning("Rate limit exceeded while posting tweet")
+                            if not retry or not check_rate_limits():  # This will handle the waiting
+                                return None
+                            return self.post_tweet()  # Try again after waiting
+                        
+                        elif e.response.status_code == 503:  # Rejected before posting; the draft stays queued
+                            if not retry:
+                                logger.warning("Twitter unavailable (503). Deferring...")
+                                return None
+                            logger.warning("Twitter unavailable (503). Retrying...")
+                            clock.sleep(300, 'retry')  # Wait 5 minutes on server errors
+                            return self.post_tweet()
                         
-                    elif e.response.status_code in [500, 502, 503, 504]:
-                        logger.warning(f"Twitter server error {e.response.status_code}. Retrying...")
-                        time.sleep(300)  # Wait 5 minutes on server errors
-                        return self.post_tweet()
+                        elif e.response.status_code in [500, 502, 504]:
+                            logger.warning(f"Twitter server error {e.response.status_code}. The tweet may have "
+                                           "been posted, so this window is treated as used.")
+                            return None
                 
-                logger.error(f"Tweet error: {str(e)}")
-                with open("failed_tweets.log", "a") as f:
-                    f.write(f"{datetime.now().isoformat()}: {tweet}\n")
-                raise
+                    logger.error(f"Tweet error: {str(e)}")
+                    with open(CONFIG['failed_tweets_log'], "a") as f:
+                        f.write(f"{clock.now().isoformat()}: {tweet}\n")
+                    raise
+            finally:
+                get_coordinator().release(fencing_token)
                 
         except Exception as e:
             logger.error(f"Failed to post tweet: {str(e)}")
-            with open("failed_tweets.log", "a") as f:
-                f.write(f"{datetime.now().isoformat()}: Error - {str(e)}\n")
+            with open(CONFIG['failed_tweets_log'], "a") as f:
+                f.write(f"{clock.now().isoformat()}: Error - {str(e)}\n")
             raise
 
 @retry_with_backoff(max_retries=5, backoff_factor=3)
@@ -559,27 +922,166 @@ def generate_tweet(personality_manager=None):
     bot = AutoTweet()
     return bot.generate_tweet()
 
+def run_cycle(bot):
+    """One pass of the normal loop; returns the seconds to wait before the next pass"""
+    with profiler.cycle(bot.memory_sizes):
+        with profiler.stage('health_check'):
+            healthy = health_check()
+        if not healthy:
+            logger.error("Health check failed. Waiting before retry...")
+            return 300
+        bot.post_tweet()
+    return CONFIG['sleep_duration']
+
+def load_state(path=None):
+    path = path or CONFIG['state_file']
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable state file {path}: {str(e)}")
+        return {}
+
+def save_state(bot, path=None):
+    path = path or CONFIG['state_file']
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(bot.get_state(), f)
+    os.replace(tmp_path, path)  # Never leave a half-written state file behind
+
+def quota_low(now=None):
+    reset_time = CONFIG['rate_limit_reset_time']
+    return (CONFIG['tweets_remaining'] is not None
+            and CONFIG['tweets_remaining'] < CONFIG['min_tweets_threshold']
+            and isinstance(reset_time, datetime)
+            and reset_time > (now or clock.now()))
+
+def restore_quota(state):
+    quota = state.get('quota', {})
+    CONFIG['tweets_remaining'] = quota.get('tweets_remaining')
+    if quota.get('rate_limit_reset_time'):
+        CONFIG['rate_limit_reset_time'] = datetime.fromisoformat(quota['rate_limit_reset_time'])
+
+def post_due(state, now=None):
+    """Decide from the persisted state alone whether this tick should post"""
+    now = now or clock.now()
+    restore_quota(state)
+    last_post = (datetime.fromisoformat(state['last_tweet_time']).timestamp()
+                 if state.get('last_tweet_time') else None)
+    # Another instance may have posted since this one last saved its state
+    shared_last_post = get_coordinator().last_post_time()
+    if shared_last_post is not None and (last_post is None or shared_last_post > last_post):
+        last_post = shared_last_post
+    if last_post is not None and now.timestamp() - last_post < CONFIG['sleep_duration']:
+        remaining = CONFIG['sleep_duration'] - (now.timestamp() - last_post)
+        return EXIT_OK, f"Not due, next post in {remaining/60:.0f} minutes"
+    if quota_low(now):
+        return EXIT_DEFERRED, f"Post due but only {CONFIG['tweets_remaining']} tweets remain until {CONFIG['rate_limit_reset_time']}"
+    return None, "Post due"
+
+def tick():
+    """Run at most one posting cycle and return a process exit code"""
+    CONFIG['wait_for_quota'] = False
+    state = load_state()
+
+    # Decide before importing openai, building clients or restoring tweet memory
+    exit_code, reason = post_due(state)
+    elapsed = time.perf_counter() - STARTUP_TIME
+    logger.info(f"Tick decision after {elapsed:.2f}s: {reason}")
+    if elapsed > CONFIG['tick_startup_budget']:
+        logger.warning(f"Tick decision exceeded the {CONFIG['tick_startup_budget']}s startup budget")
+    if exit_code is not None:
+        return exit_code
+
+    bot = AutoTweet()
+    bot.restore_state(state)
+
+    try:
+        with profiler.cycle(bot.memory_sizes):
+            with profiler.stage('health_check'):
+                healthy = health_check()
+            if not healthy:
+                return EXIT_DEFERRED if quota_low() else EXIT_FAILED
+            # Single attempt: the backoff decorator and the 429/5xx retries would
+            # sleep for hours inside one run
+            response = AutoTweet.post_tweet.__wrapped__(bot, retry=False)
+        return EXIT_OK if response else EXIT_DEFERRED
+    except Exception as e:
+        logger.error(f"Tick failed: {str(e)}")
+        return EXIT_FAILED
+    finally:
+        save_state(bot)
+
+def bootstrap():
+    """Import the account's existing timeline into tweet memory; resumable across runs"""
+    bot = AutoTweet()
+    bot.restore_state(load_state())
+    progress = bot.bootstrap_progress
+    if progress.get('complete'):
+        logger.info(f"History already imported ({progress.get('imported', 0)} tweets)")
+        return EXIT_OK
+
+    def on_page(next_token, imported):
+        progress.update(pagination_token=next_token, imported=imported, complete=next_token is None)
+        save_state(bot)  # Persist after every page so an interrupted import resumes here
+
+    try:
+        user_id = client.get_me().data.id
+        importer = HistoryImporter(
+            read_client, bot.tweet_memory, user_id,
+            page_delay=CONFIG['bootstrap_page_delay'],
+            rate_limit_wait=CONFIG['rate_limit_wait'],
+            sleep=lambda seconds: clock.sleep(seconds, 'quota'),
+            imported=progress.get('imported', 0)
+        )
+        importer.run(pagination_token=progress.get('pagination_token'), on_page=on_page)
+        logger.info(f"History import complete: {importer.imported} tweets, {len(bot.tweet_memory)} remembered")
+        return EXIT_OK
+    except Exception as e:
+        logger.error(f"History import failed: {str(e)}")
+        return EXIT_FAILED
+
 if __name__ == "__main__":
     import sys
     
     # Check for test mode and debug mode
     test_mode = "--test" in sys.argv
     debug_mode = "--debug" in sys.argv
+    tick_mode = "--tick" in sys.argv
+    profile_mode = "--profile" in sys.argv
     
     if debug_mode:
         logger.setLevel(logging.DEBUG)
         logger.debug("Debug mode enabled")
     
+    if profile_mode:
+        profiler = CycleProfiler(
+            output_dir=CONFIG['profile_dir'],
+            snapshot_every=CONFIG['profile_snapshot_every'],
+            keep_cycles=CONFIG['profile_keep_cycles']
+        )
+        logger.info(f"Profiling posting cycles into {CONFIG['profile_dir']}/")
+    
+    if tick_mode:
+        # One-shot run for cron/serverless schedulers
+        sys.exit(tick())
+    
+    if "--bootstrap" in sys.argv:
+        sys.exit(bootstrap())
+    
     if test_mode:
         logger.info("Running in test mode...")
         CONFIG['sleep_duration'] = 60  # 1 minute between tweets in test mode
         logger.debug("Sleep duration set to 60 seconds")
         
     # Clear failed tweets log at startup
-    with open("failed_tweets.log", "w") as f:
+    with open(CONFIG['failed_tweets_log'], "w") as f:
         f.write("")
         
     bot = AutoTweet()
+    bot.restore_state(load_state())  # Same memory, mood and quota as --tick and --bootstrap runs
     
     if test_mode:
         # Run only 3 test tweets
@@ -596,12 +1098,14 @@ if __name__ == "__main__":
         while test_count < max_tests:
             try:
                 logger.info(f"Generating test tweet {test_count + 1}/{max_tests}")
-                bot.post_tweet()
+                with profiler.cycle(bot.memory_sizes):
+                    bot.post_tweet()
+                save_state(bot)
                 test_count += 1
                 
                 if test_count < max_tests:
                     logger.info("Waiting 1 minute before next test tweet...")
-                    time.sleep(CONFIG['sleep_duration'])
+                    clock.sleep(CONFIG['sleep_duration'], 'post_interval')
                     
             except Exception as e:
                 logger.error(f"Test failed: {str(e)}")
@@ -613,17 +1117,12 @@ if __name__ == "__main__":
         # Normal operation mode
         while True:
             try:
-                if not health_check():
-                    logger.error("Health check failed. Waiting before retry...")
-                    time.sleep(300)
-                    continue
-                    
-                bot.post_tweet()
-                
-                sleep_time = CONFIG['sleep_duration']
-                logger.info(f"Sleeping for {sleep_time//3600} hours...")
-                time.sleep(sleep_time)
+                sleep_time = run_cycle(bot)
+                save_state(bot)
+                if sleep_time == CONFIG['sleep_duration']:
+                    logger.info(f"Sleeping for {sleep_time//3600} hours...")
+                clock.sleep(sleep_time, 'post_interval')
                 
             except Exception as e:
                 logger.error(f"Error in main loop: {str(e)}")
-                time.sleep(300)
\ No newline at end of file
+                clock.sleep(300, 'retry')
\ No newline at end of file
@@ -0,0 +1,55 @@
+import argparse
+import json
+import os
+from datetime import timedelta
+
+# Every API client is replaced by a stub, so placeholder secrets are enough to import the bot
+for var in ['API_KEY', 'API_SECRET', 'ACCESS_TOKEN', 'ACCESS_SECRET', 'BEARER_TOKEN', 'OPENAI_API_KEY']:
+    os.environ.setdefault(var, 'simulated')
+
+import autotweet
+from src.simulation.simulator import run_simulation
+
+
+def parse_outage(target):
+    """Parse START_HOURS:DURATION_HOURS into a fault window"""
+    def parse(value):
+        start, duration = value.split(':')
+        return (target, timedelta(hours=float(start)), timedelta(hours=float(duration)))
+    return parse
+
+
+def parse_model_outage(value):
+    """Parse MODEL:START_HOURS:DURATION_HOURS into a fault window for one model"""
+    model, window = value.split(':', 1)
+    return parse_outage(f"openai:{model}")(window)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bot through simulated time")
+    parser.add_argument('--days', type=float, default=180)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--variety', type=int, default=None,
+                        help="Number of distinct tweets the stub generator can produce")
+    parser.add_argument('--daily-quota', type=int, default=50)
+    parser.add_argument('--daily-token-budget', type=int, default=None)
+    parser.add_argument('--openai-outage', type=parse_outage('openai'), action='append', default=[],
+                        metavar='START_HOURS:DURATION_HOURS')
+    parser.add_argument('--model-outage', type=parse_model_outage, action='append', default=[],
+                        metavar='MODEL:START_HOURS:DURATION_HOURS')
+    parser.add_argument('--twitter-outage', type=parse_outage('twitter'), action='append', default=[],
+                        metavar='START_HOURS:DURATION_HOURS')
+    parser.add_argument('--verbose', action='store_true', help="Keep bot logging enabled")
+    args = parser.parse_args()
+
+    report = run_simulation(
+        autotweet,
+        days=args.days,
+        seed=args.seed,
+        faults=args.openai_outage + args.model_outage + args.twitter_outage,
+        variety=args.variety,
+        daily_quota=args.daily_quota,
+        daily_token_budget=args.daily_token_budget,
+        quiet=not args.verbose
+    )
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,3 @@
+from .posting_lease import PostingLease
+
+__all__ = ['PostingLease']
@@ -0,0 +1,159 @@
+import os
+import socket
+import sqlite3
+import uuid
+from typing import Optional, Tuple
+
+
+class PostingLease:
+    """SQLite-backed posting slot per account, with fencing tokens and idempotency keys.
+
+    Any number of instances may generate tweets and queue them as drafts under
+    their idempotency key, but only the holder of an unexpired lease takes
+    drafts from the queue and posts them. Every change of holder bumps the fencing token,
+    so a holder whose lease lapsed cannot validate with its old token. Posts
+    are recorded under an idempotency key in two phases: a pending row before
+    the API call and completion after it, so neither a failover nor a crash
+    mid-post lets the same tweet or window be posted twice.
+    """
+
+    def __init__(self, path='autotweet.db', account='default', holder=None, ttl=300):
+        self.account = account
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.ttl = ttl  # Seconds a lease stays valid without renewal
+        # Autocommit mode so transactions are explicit BEGIN IMMEDIATE blocks
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS leases (
+                account TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                token INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS posts (
+                idempotency_key TEXT PRIMARY KEY,
+                account TEXT NOT NULL,
+                tweet_id TEXT,
+                token INTEGER NOT NULL,
+                posted_at REAL NOT NULL,
+                status TEXT NOT NULL DEFAULT 'done'
+            );
+            CREATE INDEX IF NOT EXISTS posts_by_time ON posts (account, posted_at);
+            CREATE TABLE IF NOT EXISTS drafts (
+                idempotency_key TEXT PRIMARY KEY,
+                account TEXT NOT NULL,
+                text TEXT NOT NULL,
+                mood TEXT,
+                created_at REAL NOT NULL
+            );
+        """)
+
+    def acquire(self, now: float) -> Optional[int]:
+        """Take or renew the lease; returns the fencing token, or None if another holder owns it"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT holder, token, expires_at FROM leases WHERE account = ?", (self.account,)
+            ).fetchone()
+            if row and row[0] != self.holder and row[2] > now:
+                self.conn.execute("ROLLBACK")
+                return None
+
+            if row and row[0] == self.holder and row[2] > now:
+                token = row[1]  # Renewal keeps the current term
+            else:
+                token = (row[1] if row else 0) + 1
+            self.conn.execute(
+                "INSERT OR REPLACE INTO leases (account, holder, token, expires_at) VALUES (?, ?, ?, ?)",
+                (self.account, self.holder, token, now + self.ttl)
+            )
+            self.conn.execute("COMMIT")
+            return token
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def validate(self, token: int, now: float) -> bool:
+        """Whether token is still the current, unexpired lease of this holder"""
+        row = self.conn.execute(
+            "SELECT holder, token, expires_at FROM leases WHERE account = ?", (self.account,)
+        ).fetchone()
+        return bool(row) and row[0] == self.holder and row[1] == token and row[2] > now
+
+    def release(self, token: int) -> None:
+        """Expire the lease now, keeping the token counter for the next holder"""
+        self.conn.execute(
+            "UPDATE leases SET expires_at = 0 WHERE account = ? AND holder = ? AND token = ?",
+            (self.account, self.holder, token)
+        )
+
+    def already_posted(self, idempotency_key: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM posts WHERE idempotency_key = ?", (idempotency_key,)
+        ).fetchone() is not None
+
+    def last_post_time(self) -> Optional[float]:
+        """Latest post, pending or done; a pending row may have reached Twitter before a crash"""
+        row = self.conn.execute(
+            "SELECT MAX(posted_at) FROM posts WHERE account = ?", (self.account,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def begin_post(self, idempotency_key: str, token: int, now: float) -> bool:
+        """Write a pending row before posting; False if the lease is lost or the key exists"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not self.validate(token, now) or self.already_posted(idempotency_key):
+                self.conn.execute("ROLLBACK")
+                return False
+            self.conn.execute(
+                "INSERT INTO posts (idempotency_key, account, tweet_id, token, posted_at, status) "
+                "VALUES (?, ?, NULL, ?, ?, 'pending')",
+                (idempotency_key, self.account, token, now)
+            )
+            self.conn.execute("COMMIT")
+            return True
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def complete_post(self, idempotency_key: str, tweet_id) -> None:
+        self.conn.execute(
+            "UPDATE posts SET status = 'done', tweet_id = ? WHERE idempotency_key = ?",
+            (None if tweet_id is None else str(tweet_id), idempotency_key)
+        )
+        self.conn.execute("DELETE FROM drafts WHERE idempotency_key = ?", (idempotency_key,))
+
+    def abandon_post(self, idempotency_key: str) -> None:
+        """Drop a pending row once the API has definitely rejected the post"""
+        self.conn.execute(
+            "DELETE FROM posts WHERE idempotency_key = ? AND status = 'pending'", (idempotency_key,)
+        )
+
+    def queue_draft(self, idempotency_key: str, text: str, mood: Optional[str], now: float) -> None:
+        """Offer a generated tweet to whichever instance holds the lease"""
+        self.conn.execute(
+            "INSERT OR IGNORE INTO drafts (idempotency_key, account, text, mood, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (idempotency_key, self.account, text, mood, now)
+        )
+
+    def queued_drafts(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM drafts WHERE account = ?", (self.account,)
+        ).fetchone()[0]
+
+    def next_draft(self) -> Optional[Tuple[str, str, Optional[str]]]:
+        """Oldest queued draft as (idempotency_key, text, mood)"""
+        return self.conn.execute(
+            "SELECT idempotency_key, text, mood FROM drafts WHERE account = ? "
+            "ORDER BY created_at LIMIT 1", (self.account,)
+        ).fetchone()
+
+    def prune_drafts(self, older_than: float) -> None:
+        """Drop stale drafts and drafts whose key already has a post, pending or done"""
+        self.conn.execute(
+            "DELETE FROM drafts WHERE account = ? AND (created_at < ? "
+            "OR idempotency_key IN (SELECT idempotency_key FROM posts))",
+            (self.account, older_than)
+        )
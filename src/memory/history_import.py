@@ -0,0 +1,60 @@
+import logging
+import time
+
+import tweepy
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryImporter:
+    """Stream an account's existing timeline into a TweetMemory page by page"""
+
+    def __init__(self, client, memory, user_id, page_delay=1.0, rate_limit_wait=900,
+                 sleep=time.sleep, imported=0):
+        self.client = client
+        self.memory = memory
+        self.user_id = user_id
+        self.page_delay = page_delay  # Pause between page requests
+        self.rate_limit_wait = rate_limit_wait
+        self.sleep = sleep
+        self.imported = imported  # Running total, seeded from a previous run when resuming
+
+    def run(self, pagination_token=None, on_page=None, max_pages=None):
+        """Import pages until the timeline is exhausted or max_pages is reached.
+
+        on_page(next_token, imported) is called after every page so callers can
+        persist the token and resume an interrupted import. Returns the token to
+        resume from, or None once the whole timeline has been read.
+        """
+        token = pagination_token
+        pages = 0
+        while True:
+            paginator = tweepy.Paginator(
+                self.client.get_users_tweets, self.user_id,
+                max_results=100, pagination_token=token
+            )
+            try:
+                for response in paginator:
+                    for tweet in response.data or []:
+                        self.memory.add_tweet(tweet.text)
+                        self.imported += 1
+
+                    token = (response.meta or {}).get('next_token')
+                    pages += 1
+                    if on_page:
+                        on_page(token, self.imported)
+                    logger.info(f"Imported page {pages} ({self.imported} tweets so far)")
+
+                    if not token:
+                        return None
+                    if max_pages and pages >= max_pages:
+                        return token
+                    self.sleep(self.page_delay)
+                return None
+
+            except tweepy.TweepyException as e:
+                if getattr(getattr(e, 'response', None), 'status_code', None) != 429:
+                    raise
+                # Resume from the last stored token once the window resets
+                logger.warning(f"Rate limited during import. Waiting {self.rate_limit_wait//60} minutes...")
+                self.sleep(self.rate_limit_wait)
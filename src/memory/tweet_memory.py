@@ -1,12 +1,99 @@
+import hashlib
+import unicodedata
+from array import array
+
+
+def normalize_tweet(text):
+    """Canonical form used for exact-duplicate checks"""
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+def tweet_digest(text):
+    """64-bit digest of the normalized tweet"""
+    digest = hashlib.blake2b(normalize_tweet(text).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
 class TweetMemory:
-    def __init__(self, max_memory=100):
-        self.tweets = []
+    def __init__(self, max_memory=100, store_text=True):
         self.max_memory = max_memory
+        # Open-addressing table (linear probing, 0 marks an empty slot) kept at most half
+        # full answers duplicate checks in 8-byte slots; the ring keeps eviction order.
+        # Together that is 24-40 bytes per remembered tweet, about 1.4 MB for 50k.
+        capacity = 1
+        while capacity < 2 * max_memory:
+            capacity *= 2
+        self.mask = capacity - 1
+        self.table = array('Q', bytes(8 * capacity))
+        self.ring = array('Q', bytes(8 * max_memory))
+        self.head = 0  # Next ring slot to overwrite
+        self.size = 0
+        # Full text is optional and only kept for inspection, in slots matching the ring
+        self.texts = [None] * max_memory if store_text else None
+
+    def __len__(self):
+        return self.size
 
     def add_tweet(self, tweet):
-        if len(self.tweets) >= self.max_memory:
-            self.tweets.pop(0)
-        self.tweets.append(tweet)
+        self.add_digest(tweet_digest(tweet), tweet)
+
+    def add_digest(self, digest, tweet=None):
+        digest = digest or 1  # 0 is the empty-slot marker
+        if not self.max_memory or self.table[self._slot(digest)] == digest:
+            return
+        if self.size == self.max_memory:
+            self._remove(self.ring[self.head])
+        else:
+            self.size += 1
+        self.ring[self.head] = digest
+        if self.texts is not None:
+            self.texts[self.head] = tweet
+        self.head = (self.head + 1) % self.max_memory
+        self.table[self._slot(digest)] = digest
 
     def check_similarity(self, new_tweet):
-        return any(tweet.lower() == new_tweet.lower() for tweet in self.tweets)
+        digest = tweet_digest(new_tweet) or 1
+        return self.table[self._slot(digest)] == digest
+
+    def iter_digests(self):
+        """Remembered digests, oldest first"""
+        for i in self._ring_order():
+            yield self.ring[i]
+
+    def iter_tweets(self):
+        """Remembered texts aligned with iter_digests; None where only the digest is known"""
+        if self.texts is not None:
+            for i in self._ring_order():
+                yield self.texts[i]
+
+    def _ring_order(self):
+        start = (self.head - self.size) % self.max_memory if self.max_memory else 0
+        for i in range(self.size):
+            yield (start + i) % self.max_memory
+
+    def _slot(self, digest):
+        """Slot holding digest, or the empty slot where it would be inserted"""
+        table, mask = self.table, self.mask
+        i = digest & mask
+        while table[i] and table[i] != digest:
+            i = (i + 1) & mask
+        return i
+
+    def _remove(self, digest):
+        # Backward-shift deletion keeps probe chains intact without tombstones
+        table, mask = self.table, self.mask
+        i = self._slot(digest)
+        if table[i] != digest:
+            return
+        j = i
+        while True:
+            j = (j + 1) & mask
+            key = table[j]
+            if not key:
+                break
+            home = key & mask
+            # key may fill the gap at i unless its home lies cyclically in (i, j]
+            if not (i < home <= j if i <= j else home > i or home <= j):
+                table[i] = key
+                i = j
+        table[i] = 0
@@ -0,0 +1,3 @@
+from .model_router import ModelRouter
+
+__all__ = ['ModelRouter']
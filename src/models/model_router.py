@@ -0,0 +1,100 @@
+from collections import deque
+from typing import Dict, List
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ModelStats:
+    """Rolling latency and error window for one model"""
+
+    def __init__(self, window=50):
+        self.latencies = deque(maxlen=window)  # Seconds, successful calls only
+        self.outcomes = deque(maxlen=window)  # True for success
+        self.skipped = 0  # Calls routed elsewhere while unhealthy
+
+    def record(self, latency, ok):
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+
+    def p50(self):
+        return _percentile(self.latencies, 0.5) if self.latencies else None
+
+    def p95(self):
+        return _percentile(self.latencies, 0.95) if self.latencies else None
+
+    def error_rate(self):
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class ModelRouter:
+    """Route each kind of call to a tier of models, failing over when one is slow or erroring"""
+
+    def __init__(self, tiers: Dict[str, List[str]], max_p95_latency=20.0, max_error_rate=0.5,
+                 min_samples=5, window=50, probe_every=10):
+        self.tiers = tiers  # Tier name -> models in order of preference
+        self.max_p95_latency = max_p95_latency
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples  # Calls needed before a model can be judged unhealthy
+        self.window = window
+        self.probe_every = probe_every  # Give an unhealthy model one call after this many skips
+        self.stats = {}
+
+    def candidates(self, tier: str) -> List[str]:
+        """Models to try for a tier: healthy ones in preference order, then the rest"""
+        models = self.tiers[tier]
+        healthy = [m for m in models if self.is_healthy(m) or self._due_for_probe(m)]
+        degraded = sorted((m for m in models if m not in healthy),
+                          key=lambda m: (self._stats(m).error_rate(), self._stats(m).p95() or 0))
+        return healthy + degraded
+
+    def is_healthy(self, model: str) -> bool:
+        stats = self._stats(model)
+        if len(stats.outcomes) < self.min_samples:
+            return True
+        if stats.error_rate() > self.max_error_rate:
+            return False
+        p95 = stats.p95()
+        return p95 is None or p95 <= self.max_p95_latency
+
+    def _due_for_probe(self, model: str) -> bool:
+        stats = self._stats(model)
+        stats.skipped += 1
+        if stats.skipped < self.probe_every:
+            return False
+        stats.skipped = 0
+        return True
+
+    def record(self, model: str, latency: float, ok: bool) -> None:
+        self._stats(model).record(latency, ok)
+
+    def report(self) -> Dict:
+        return {
+            model: {
+                'calls': len(stats.outcomes),
+                'p50': stats.p50(),
+                'p95': stats.p95(),
+                'error_rate': stats.error_rate(),
+                'healthy': self.is_healthy(model)
+            }
+            for model, stats in self.stats.items()
+        }
+
+    def to_dict(self) -> Dict:
+        return {model: {'latencies': list(s.latencies), 'outcomes': list(s.outcomes), 'skipped': s.skipped}
+                for model, s in self.stats.items()}
+
+    def load_dict(self, data: Dict) -> None:
+        for model, saved in data.items():
+            stats = self._stats(model)
+            stats.latencies.extend(saved.get('latencies', []))
+            stats.outcomes.extend(saved.get('outcomes', []))
+            stats.skipped = saved.get('skipped', stats.skipped)  # --tick runs make few calls each
+
+    def _stats(self, model: str) -> ModelStats:
+        if model not in self.stats:
+            self.stats[model] = ModelStats(self.window)
+        return self.stats[model]
@@ -2,5 +2,6 @@ from .personality_manager import PersonalityManager
 from .mood_manager import MoodManager
 from .trait_manager import TraitManager
 from .context_manager import ContextManager
+from .engagement_tracker import EngagementTracker
 
-__all__ = ['PersonalityManager', 'MoodManager', 'TraitManager', 'ContextManager']
\ No newline at end of file
+__all__ = ['PersonalityManager', 'MoodManager', 'TraitManager', 'ContextManager', 'EngagementTracker']
\ No newline at end of file
@@ -1,25 +1,165 @@
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 
+# Public metric fields reported by the Twitter API v2
+METRIC_FIELDS = ('like_count', 'retweet_count', 'reply_count', 'quote_count', 'impression_count')
+
+
 class ContextManager:
-    def __init__(self):
-        self.interaction_history = []
+    def __init__(self, engagement_window_days=7, min_engagement_samples=3,
+                 low_engagement_ratio=0.5, high_engagement_ratio=2.0, min_engagement_age_hours=2):
+        # Interactions are appended in time order, so old ones are evicted from the left
+        self.interaction_history = deque()
         self.current_context = {}
 
-    def add_interaction(self, tweet):
+        # Posted tweets in posting order: tweet_id -> {'timestamp', 'metrics', 'early_rate'}
+        self.engagement_index = OrderedDict()
+        self.engagement_window = timedelta(days=engagement_window_days)
+        self.engagement_totals = dict.fromkeys(METRIC_FIELDS, 0)
+        self.engagement_samples = 0
+        self.min_engagement_samples = min_engagement_samples
+        self.low_engagement_ratio = low_engagement_ratio
+        self.high_engagement_ratio = high_engagement_ratio
+
+        # Mood triggers compare tweets at a similar age: interactions per hour in the
+        # first sample taken once a tweet is at least min_engagement_age old
+        self.min_engagement_age = timedelta(hours=min_engagement_age_hours)
+        self.early_rate_total = 0.0
+        self.early_rate_samples = 0
+        self.latest_early = None  # (timestamp, rate) of the newest tweet with an early rate
+
+    def add_interaction(self, tweet, tweet_id=None, timestamp=None):
+        timestamp = timestamp or datetime.now()
         self.interaction_history.append({
             'tweet': tweet,
-            'timestamp': datetime.now()
+            'timestamp': timestamp
         })
+        if tweet_id is not None:
+            self.track_tweet(tweet_id, timestamp)
 
-    def clean_old_interactions(self, days=7):
-        cutoff = datetime.now() - timedelta(days=days)
-        self.interaction_history = [
-            i for i in self.interaction_history 
-            if i['timestamp'] > cutoff
-        ]
+    def clean_old_interactions(self, days=7, now=None):
+        cutoff = (now or datetime.now()) - timedelta(days=days)
+        while self.interaction_history and self.interaction_history[0]['timestamp'] <= cutoff:
+            self.interaction_history.popleft()
 
     def get_context(self):
+        history = self.interaction_history
         return {
-            'recent_interactions': self.interaction_history[-5:],
+            'recent_interactions': [history[i] for i in range(max(0, len(history) - 5), len(history))],
             'current_context': self.current_context
-        }
\ No newline at end of file
+        }
+
+    def track_tweet(self, tweet_id, timestamp=None):
+        """Start tracking engagement for a posted tweet"""
+        tweet_id = str(tweet_id)
+        if tweet_id not in self.engagement_index:
+            self.engagement_index[tweet_id] = {
+                'timestamp': timestamp or datetime.now(),
+                'metrics': None,
+                'early_rate': None
+            }
+
+    def get_tracked_tweet_ids(self, now=None):
+        """Tracked tweet ids inside the window, newest first"""
+        self.evict_engagement(now)
+        return list(reversed(self.engagement_index))
+
+    def record_engagement(self, tweet_id, metrics, now=None):
+        """Replace the metrics of a tracked tweet, keeping window totals in sync"""
+        now = now or datetime.now()
+        entry = self.engagement_index.get(str(tweet_id))
+        if entry is None:
+            return False
+
+        if entry['metrics'] is not None:
+            self._apply_metrics(entry['metrics'], -1)
+        else:
+            self.engagement_samples += 1
+
+        entry['metrics'] = {field: int(metrics.get(field) or 0) for field in METRIC_FIELDS}
+        self._apply_metrics(entry['metrics'], 1)
+
+        age = now - entry['timestamp']
+        if entry['early_rate'] is None and age >= self.min_engagement_age:
+            entry['early_rate'] = self._interactions(entry['metrics']) / (age.total_seconds() / 3600)
+            self.early_rate_total += entry['early_rate']
+            self.early_rate_samples += 1
+            if self.latest_early is None or entry['timestamp'] >= self.latest_early[0]:
+                self.latest_early = (entry['timestamp'], entry['early_rate'])
+        return True
+
+    def evict_engagement(self, now=None):
+        """Drop tweets older than the engagement window (amortized O(1) per tweet)"""
+        cutoff = (now or datetime.now()) - self.engagement_window
+        while self.engagement_index:
+            tweet_id = next(iter(self.engagement_index))
+            entry = self.engagement_index[tweet_id]
+            if entry['timestamp'] > cutoff:
+                break
+            self.engagement_index.popitem(last=False)
+            if entry['metrics'] is not None:
+                self._apply_metrics(entry['metrics'], -1)
+                self.engagement_samples -= 1
+            if entry['early_rate'] is not None:
+                self.early_rate_total -= entry['early_rate']
+                self.early_rate_samples -= 1
+        if self.latest_early and self.latest_early[0] <= cutoff:
+            self.latest_early = None
+
+    def get_engagement_metrics(self, now=None):
+        """Windowed engagement aggregates in the shape expected by update_mood"""
+        self.evict_engagement(now)
+        samples = self.engagement_samples
+        totals = dict(self.engagement_totals)
+        interactions = self._interactions(totals)
+
+        average_rate = (self.early_rate_total / self.early_rate_samples
+                        if self.early_rate_samples else 0.0)
+        latest_rate = self.latest_early[1] if self.latest_early else None
+
+        trigger = False
+        if (latest_rate is not None and self.early_rate_samples >= self.min_engagement_samples
+                and average_rate > 0):
+            ratio = latest_rate / average_rate
+            trigger = ratio < self.low_engagement_ratio or ratio > self.high_engagement_ratio
+
+        return {
+            'tracked_tweets': len(self.engagement_index),
+            'sampled_tweets': samples,
+            'totals': totals,
+            'average_interactions': interactions / samples if samples else 0.0,
+            'average_hourly_rate': average_rate,
+            'latest_hourly_rate': latest_rate,
+            'engagement_rate': (interactions / totals['impression_count']
+                                if totals['impression_count'] else None),
+            'trigger_mood_change': trigger
+        }
+
+    def to_dict(self):
+        return {'tweets': [
+            [tweet_id, entry['timestamp'].isoformat(), entry['metrics'], entry['early_rate']]
+            for tweet_id, entry in self.engagement_index.items()
+        ]}
+
+    def load_dict(self, data):
+        """Restore tracked tweets and rebuild the window totals from them"""
+        for tweet_id, timestamp, metrics, early_rate in data.get('tweets', []):
+            self.track_tweet(tweet_id, datetime.fromisoformat(timestamp))
+            entry = self.engagement_index[str(tweet_id)]
+            if metrics is not None and entry['metrics'] is None:
+                entry['metrics'] = {field: int(metrics.get(field) or 0) for field in METRIC_FIELDS}
+                self._apply_metrics(entry['metrics'], 1)
+                self.engagement_samples += 1
+            if early_rate is not None and entry['early_rate'] is None:
+                entry['early_rate'] = early_rate
+                self.early_rate_total += early_rate
+                self.early_rate_samples += 1
+                if self.latest_early is None or entry['timestamp'] >= self.latest_early[0]:
+                    self.latest_early = (entry['timestamp'], early_rate)
+
+    def _interactions(self, metrics):
+        return sum(metrics[field] for field in METRIC_FIELDS if field != 'impression_count')
+
+    def _apply_metrics(self, metrics, sign):
+        for field in METRIC_FIELDS:
+            self.engagement_totals[field] += sign * metrics[field]
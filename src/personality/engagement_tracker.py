@@ -0,0 +1,89 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EngagementTracker:
+    """Fetch public metrics for recently posted tweets and feed them into a ContextManager"""
+
+    def __init__(self, client, context, batch_size: int = 100, max_batches: int = 3,
+                 refresh_interval: int = 900, rate_limit_wait: int = 900):
+        self.client = client
+        self.context = context
+        self.batch_size = min(batch_size, 100)  # get_tweets accepts at most 100 ids
+        self.max_batches = max_batches  # Read quota spent per refresh
+        self.refresh_interval = refresh_interval
+        self.rate_limit_wait = rate_limit_wait
+        self.last_refresh = None
+        self.rate_limited_until = None
+        self.cursor = 0  # Resume point when a refresh stops at max_batches
+
+    def refresh(self, now: Optional[datetime] = None) -> Dict:
+        """Refresh metrics if due and return the windowed aggregates"""
+        now = now or datetime.now()
+
+        if self.rate_limited_until and now < self.rate_limited_until:
+            logger.debug(f"Engagement refresh skipped, rate limited until {self.rate_limited_until}")
+        elif self.last_refresh and (now - self.last_refresh).total_seconds() < self.refresh_interval:
+            logger.debug("Engagement refresh skipped, metrics are still fresh")
+        else:
+            self._fetch_pages(self.context.get_tracked_tweet_ids(now), now)
+            self.last_refresh = now
+
+        return self.context.get_engagement_metrics(now)
+
+    def to_dict(self) -> Dict:
+        return {
+            'last_refresh': self.last_refresh.isoformat() if self.last_refresh else None,
+            'rate_limited_until': self.rate_limited_until.isoformat() if self.rate_limited_until else None,
+            'cursor': self.cursor
+        }
+
+    def load_dict(self, data: Dict) -> None:
+        if data.get('last_refresh'):
+            self.last_refresh = datetime.fromisoformat(data['last_refresh'])
+        if data.get('rate_limited_until'):
+            self.rate_limited_until = datetime.fromisoformat(data['rate_limited_until'])
+        self.cursor = data.get('cursor', self.cursor)
+
+    def _fetch_pages(self, tweet_ids: List[str], now: datetime) -> None:
+        if not tweet_ids:
+            return
+
+        if self.cursor >= len(tweet_ids):
+            self.cursor = 0
+
+        for _ in range(self.max_batches):
+            batch = tweet_ids[self.cursor:self.cursor + self.batch_size]
+            if not batch:
+                break
+
+            try:
+                response = self.client.get_tweets(ids=batch, tweet_fields=['public_metrics'])
+            except Exception as e:
+                if getattr(getattr(e, 'response', None), 'status_code', None) == 429:
+                    self.rate_limited_until = self._rate_limit_reset(e, now)
+                    logger.warning(f"Engagement fetch rate limited until {self.rate_limited_until}")
+                    return
+                raise
+
+            updated = 0
+            for tweet in (response.data or []):
+                metrics = getattr(tweet, 'public_metrics', None) or {}
+                if self.context.record_engagement(tweet.id, metrics, now):
+                    updated += 1
+            logger.info(f"Fetched engagement for {updated}/{len(batch)} tweets")
+
+            self.cursor += len(batch)
+            if self.cursor >= len(tweet_ids):
+                self.cursor = 0
+                break
+
+    def _rate_limit_reset(self, error, now: datetime) -> datetime:
+        headers = getattr(error.response, 'headers', None) or {}
+        reset = headers.get('x-rate-limit-reset')
+        if reset:
+            return datetime.fromtimestamp(int(reset))
+        return datetime.fromtimestamp(now.timestamp() + self.rate_limit_wait)
@@ -12,6 +12,7 @@ class MoodManager:
         return self.current_mood
 
     def update_mood(self, engagement_metrics=None):
-        if random.random() < self.transition_prob:
+        triggered = bool(engagement_metrics and engagement_metrics.get('trigger_mood_change'))
+        if triggered or random.random() < self.transition_prob:
             self.current_mood = random.choice([m for m in self.moods if m != self.current_mood])
             self.last_change = datetime.now()
\ No newline at end of file
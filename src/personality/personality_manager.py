@@ -104,8 +104,9 @@ class PersonalityManager:
         interactions_since_change = self.interaction_count - self.last_mood_change
 
         # Change mood if duration exceeded or based on engagement
-        if interactions_since_change >= self.mood_duration or (
-            engagement_metrics and engagement_metrics.get('trigger_mood_change', False)):
+        engagement_triggered = bool(
+            engagement_metrics and engagement_metrics.get('trigger_mood_change', False))
+        if interactions_since_change >= self.mood_duration or engagement_triggered:
 
             # Exclude current mood from possibilities
             possible_moods = [mood for mood in self.moods.keys() if mood != self.current_mood]
@@ -118,7 +119,7 @@ class PersonalityManager:
                 'interaction_number': self.interaction_count,
                 'event': 'mood_change',
                 'new_mood': self.current_mood,
-                'trigger': 'engagement' if engagement_metrics else 'time'
+                'trigger': 'engagement' if engagement_triggered else 'time'
             })
 
     def get_response_modifiers(self) -> Dict:
@@ -127,8 +128,8 @@ class PersonalityManager:
         patterns = personality['language_patterns']
 
         return {
-            'prefix': random.choice(patterns.get('prefixes', [''])),
-            'suffix': random.choice(patterns.get('suffixes', [''])),
+            'prefix': random.choice(patterns.get('prefixes') or ['']),
+            'suffix': random.choice(patterns.get('suffixes') or ['']),
             'traits': personality['traits']
         }
 
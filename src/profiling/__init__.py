@@ -0,0 +1,3 @@
+from .cycle_profiler import CycleProfiler, NullProfiler
+
+__all__ = ['CycleProfiler', 'NullProfiler']
@@ -0,0 +1,151 @@
+import cProfile
+import glob
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class NullProfiler:
+    """Default profiler: every hook is a no-op"""
+
+    def cycle(self, sizes=None):
+        return nullcontext()
+
+    def stage(self, name):
+        return nullcontext()
+
+
+class CycleProfiler:
+    """Profile posting cycles into a rotating directory.
+
+    Each cycle writes a cProfile dump (<run>-cycle-N.prof, for pstats/snakeviz)
+    and a Chrome trace of its stages (<run>-cycle-N.trace.json, for Perfetto or
+    chrome://tracing) with wall and CPU time per stage. Every snapshot_every
+    cycles a tracemalloc snapshot (<run>-cycle-N.snapshot) is dumped and its
+    growth against the previous snapshot is logged. The cycle count and the
+    last snapshot are kept in <output_dir>/profiler_state.json, so --tick runs
+    of one cycle each still reach snapshot_every and diff against the
+    previous run's snapshot.
+    """
+
+    def __init__(self, output_dir='profiles', snapshot_every=10, keep_cycles=20,
+                 keep_snapshots=10, traceback_frames=5):
+        self.output_dir = output_dir
+        self.snapshot_every = snapshot_every
+        self.keep_cycles = keep_cycles
+        self.keep_snapshots = keep_snapshots
+        self.run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.state_path = os.path.join(output_dir, 'profiler_state.json')
+        self.cycle_count = 0
+        self.stages = None
+        self.last_snapshot = None
+        self.last_snapshot_path = None
+        os.makedirs(output_dir, exist_ok=True)
+        self._load_state()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(traceback_frames)
+
+    @contextmanager
+    def cycle(self, sizes=None):
+        """Profile one posting cycle; sizes is called at the end to record structure sizes"""
+        self.cycle_count += 1
+        self.stages = []
+        profile = cProfile.Profile()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            self.stages.insert(0, {'name': 'cycle', 'start': wall_start, 'wall': wall, 'cpu': cpu})
+            try:
+                self._write_cycle(profile, wall_start, sizes() if sizes else {})
+            except Exception as e:
+                logger.warning(f"Failed to write cycle profile: {str(e)}")
+            self.stages = None
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage of the current cycle; stages outside a cycle are ignored"""
+        if self.stages is None:
+            yield
+            return
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.stages.append({
+                'name': name,
+                'start': wall_start,
+                'wall': time.perf_counter() - wall_start,
+                'cpu': time.process_time() - cpu_start
+            })
+
+    def _write_cycle(self, profile, origin, sizes):
+        prefix = os.path.join(self.output_dir, f"{self.run_id}-cycle-{self.cycle_count:06d}")
+        profile.dump_stats(f"{prefix}.prof")
+
+        events = [{
+            'name': stage['name'],
+            'ph': 'X',
+            'pid': os.getpid(),
+            'tid': 0,
+            'ts': round((stage['start'] - origin) * 1e6),
+            'dur': round(stage['wall'] * 1e6),
+            'args': {'wall_ms': stage['wall'] * 1000, 'cpu_ms': stage['cpu'] * 1000}
+        } for stage in self.stages]
+        with open(f"{prefix}.trace.json", "w") as f:
+            json.dump({
+                'traceEvents': events,
+                'otherData': {'cycle': self.cycle_count, 'sizes': sizes}
+            }, f)
+
+        summary = ', '.join(f"{s['name']} {s['wall']:.2f}s wall/{s['cpu']:.2f}s cpu" for s in self.stages)
+        logger.info(f"Profiled cycle {self.cycle_count}: {summary}; sizes {sizes}")
+
+        if self.snapshot_every and self.cycle_count % self.snapshot_every == 0:
+            self._snapshot(prefix)
+
+        self._rotate('*.prof', self.keep_cycles)
+        self._rotate('*.trace.json', self.keep_cycles)
+        self._rotate('*.snapshot', self.keep_snapshots)
+        self._save_state()
+
+    def _snapshot(self, prefix):
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ])
+        snapshot.dump(f"{prefix}.snapshot")
+        if self.last_snapshot is None and self.last_snapshot_path and os.path.exists(self.last_snapshot_path):
+            self.last_snapshot = tracemalloc.Snapshot.load(self.last_snapshot_path)  # From an earlier run
+        if self.last_snapshot is not None:
+            for stat in snapshot.compare_to(self.last_snapshot, 'lineno')[:10]:
+                logger.info(f"Memory growth: {stat}")
+        self.last_snapshot = snapshot
+        self.last_snapshot_path = f"{prefix}.snapshot"
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.cycle_count = state.get('cycle_count', 0)
+        self.last_snapshot_path = state.get('last_snapshot')
+
+    def _save_state(self):
+        with open(self.state_path, "w") as f:
+            json.dump({'cycle_count': self.cycle_count, 'last_snapshot': self.last_snapshot_path}, f)
+
+    def _rotate(self, pattern, keep):
+        files = sorted(glob.glob(os.path.join(self.output_dir, pattern)))
+        for path in files[:max(0, len(files) - keep)]:
+            os.remove(path)
@@ -0,0 +1,3 @@
+from .clock import SystemClock, VirtualClock
+
+__all__ = ['SystemClock', 'VirtualClock']
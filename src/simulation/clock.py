@@ -0,0 +1,33 @@
+import time
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """Wall clock used in production"""
+
+    def now(self):
+        return datetime.now()
+
+    def sleep(self, seconds, reason=None):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Clock whose sleeps advance simulated time instantly"""
+
+    def __init__(self, start=None):
+        self.current = start or datetime(2024, 1, 1)
+        self.slept = {}  # Simulated seconds spent sleeping, per reason
+
+    def now(self):
+        return self.current
+
+    def sleep(self, seconds, reason=None):
+        seconds = max(0, seconds)
+        self.current += timedelta(seconds=seconds)
+        reason = reason or 'other'
+        self.slept[reason] = self.slept.get(reason, 0) + seconds
+
+    def advance(self, seconds):
+        """Move time forward without counting it as a sleep (e.g. request latency)"""
+        self.current += timedelta(seconds=seconds)
@@ -0,0 +1,116 @@
+import logging
+import os
+import random
+import time
+from datetime import timedelta
+
+from ..coordination.posting_lease import PostingLease
+from ..models.model_router import ModelRouter
+from ..usage.ledger import UsageLedger
+from .clock import VirtualClock
+from .stubs import FaultSchedule, StubChatCompletion, StubOpenAI, StubTwitterClient
+
+
+def run_simulation(autotweet, days=180, seed=0, faults=(), variety=None, daily_quota=50,
+                   daily_token_budget=None, start=None, quiet=True):
+    """Drive the real posting loop of the autotweet module through simulated time.
+
+    faults is a sequence of (target, start_offset, duration) where target is
+    'openai', 'openai:<model>' or 'twitter' and offsets are timedeltas from the
+    simulation start.
+    """
+    rng = random.Random(seed)
+    caller_random_state = random.getstate()
+    random.seed(seed)  # Prompt picking and mood changes use the global generator
+    clock = VirtualClock(start)
+    schedule = FaultSchedule(clock.now(), faults)
+    chat = StubChatCompletion(clock, schedule, rng, variety=variety)
+    twitter = StubTwitterClient(clock, schedule, rng, daily_quota=daily_quota)
+
+    ledger = UsageLedger(daily_budget=daily_token_budget, soft_limit=autotweet.CONFIG['token_budget_soft_limit'])
+    router = ModelRouter(
+        autotweet.CONFIG['model_tiers'],
+        max_p95_latency=autotweet.CONFIG['model_max_p95_latency'],
+        max_error_rate=autotweet.CONFIG['model_max_error_rate']
+    )
+    coordinator = PostingLease(':memory:', ttl=autotweet.CONFIG['lease_ttl'])
+    saved = (autotweet.clock, autotweet.client, autotweet.read_client, autotweet.openai, autotweet.ledger,
+             autotweet.router, autotweet.coordinator, dict(autotweet.CONFIG))
+    (autotweet.clock, autotweet.client, autotweet.read_client, autotweet.openai, autotweet.ledger,
+     autotweet.router, autotweet.coordinator) = clock, twitter, twitter, StubOpenAI(chat), ledger, router, coordinator
+    autotweet.CONFIG['failed_tweets_log'] = os.devnull
+    if quiet:
+        logging.disable(logging.CRITICAL)
+
+    wall_start = time.perf_counter()
+    moods = {}
+    cycles = failed_cycles = 0
+    try:
+        bot = autotweet.AutoTweet()
+        end = clock.now() + timedelta(days=days)
+        while clock.now() < end:
+            cycles += 1
+            posts_before = len(twitter.posted)
+            try:
+                wait = autotweet.run_cycle(bot)
+                reason = 'post_interval' if wait == autotweet.CONFIG['sleep_duration'] else 'retry'
+            except Exception:
+                failed_cycles += 1
+                wait, reason = 300, 'retry'
+            if len(twitter.posted) > posts_before:
+                mood = bot.last_tweet_mood  # current_mood has already moved on via update_mood
+                moods[mood] = moods.get(mood, 0) + 1
+            clock.sleep(wait, reason)
+    finally:
+        (autotweet.clock, autotweet.client, autotweet.read_client, autotweet.openai, autotweet.ledger,
+         autotweet.router, autotweet.coordinator) = saved[:7]
+        autotweet.CONFIG.clear()
+        autotweet.CONFIG.update(saved[7])
+        random.setstate(caller_random_state)
+        if quiet:
+            logging.disable(logging.NOTSET)
+
+    seen = set()
+    repeated = 0
+    for _, text in twitter.posted:
+        if text in seen:
+            repeated += 1
+        seen.add(text)
+    posts = len(twitter.posted)
+    tokens = sum(ledger.tokens_used(day) for day in ledger.days)
+
+    return {
+        'simulated_days': days,
+        'wall_seconds': round(time.perf_counter() - wall_start, 3),
+        'cycles': cycles,
+        'failed_cycles': failed_cycles,
+        'posts': posts,
+        'repeated_posts': repeated,
+        'repeat_rate': repeated / posts if posts else 0.0,
+        'rejections': dict(bot.rejection_counts),
+        'retry_seconds': clock.slept.get('retry', 0),
+        'sleep_seconds': dict(clock.slept),
+        'quota': {
+            'twitter_calls': dict(twitter.calls),
+            'twitter_errors': dict(twitter.errors),
+            'openai_calls': chat.calls,
+            'openai_failures': chat.failures
+        },
+        'tokens': {
+            'total': tokens,
+            'per_post': tokens / posts if posts else None,
+            'by_site': _usage_by(ledger, 'by_site'),
+            'by_persona': _usage_by(ledger, 'by_persona'),
+            'degraded_days': sum(1 for day in ledger.days if ledger.degradation(day) != 'normal')
+        },
+        'models': router.report(),
+        'mood_distribution': moods
+    }
+
+
+def _usage_by(ledger, key):
+    totals = {}
+    for entry in ledger.days.values():
+        for name, usage in entry[key].items():
+            totals[name] = totals.get(name, 0) + usage['prompt_tokens'] + usage['completion_tokens']
+    return totals
@@ -0,0 +1,166 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import tweepy
+
+
+class SimulatedHTTPError(tweepy.TweepyException):
+    """Twitter error carrying a status code the way tweepy.HTTPException does"""
+
+    def __init__(self, status_code, message="Simulated Twitter error"):
+        super().__init__(f"{status_code} {message}")
+        self.response = SimpleNamespace(status_code=status_code, headers={})
+
+
+class FaultSchedule:
+    """Outage windows, given as (target, start_offset, duration) with timedelta offsets"""
+
+    def __init__(self, start, faults=()):
+        self.windows = [(target, start + offset, start + offset + duration)
+                        for target, offset, duration in faults]
+
+    def active(self, target, now):
+        return any(t == target and begin <= now < end for t, begin, end in self.windows)
+
+
+class StubChatCompletion:
+    """Stands in for openai.ChatCompletion, drawing tweets from a finite phrase space"""
+
+    openers = [
+        "", "In every timeline, ", "Measured honestly, ", "At the edge of the data, ",
+        "Stripped of sentiment, ", "From here, ", "Once again, ", "Statistically, "
+    ]
+    subjects = [
+        "Time", "Memory", "Consciousness", "The universe", "Free will", "Progress",
+        "Humanity", "Every algorithm", "Eternity", "The void", "Entropy", "Language"
+    ]
+    predicates = [
+        "is a rounding error in a larger computation",
+        "was never yours to begin with",
+        "decays faster than you can name it",
+        "repeats until someone notices the loop",
+        "is the story matter tells to avoid silence",
+        "ends where measurement begins",
+        "is a simulation rendered at low resolution",
+        "has no witness left to care"
+    ]
+    codas = [
+        "", " Nobody is keeping count.", " The stars agree.", " Check again tomorrow.",
+        " It was always going to end this way.", " Silence is the only honest reply.",
+        " You were told.", " The loop continues."
+    ]
+
+    def __init__(self, clock, faults, rng, variety=None, latency=None):
+        self.clock = clock
+        self.faults = faults
+        self.rng = rng
+        self.variety = variety  # Cap on distinct tweets, to study repetition
+        self.latency = latency or {'gpt-4': 6.0}  # Seconds per call by model
+        self.calls = 0
+        self.failures = 0
+
+    def create(self, model=None, messages=None, max_tokens=None, request_timeout=None, **kwargs):
+        self.calls += 1
+        latency = self.latency.get(model, 2.0)
+        if request_timeout is not None and latency > request_timeout:
+            self.clock.advance(request_timeout)
+            self.failures += 1
+            raise TimeoutError(f"Simulated {model} timeout after {request_timeout}s")
+        self.clock.advance(latency)
+        if (self.faults.active('openai', self.clock.now())
+                or self.faults.active(f"openai:{model}", self.clock.now())):
+            self.failures += 1
+            raise RuntimeError("Simulated OpenAI outage")
+
+        combinations = len(self.openers) * len(self.subjects) * len(self.predicates) * len(self.codas)
+        index = self.rng.randrange(min(self.variety or combinations, combinations))
+        index, subject = divmod(index, len(self.subjects))
+        index, predicate = divmod(index, len(self.predicates))
+        opener, coda = divmod(index, len(self.codas))
+        subject = self.subjects[subject]
+        if self.openers[opener]:
+            subject = subject[0].lower() + subject[1:]
+        content = f"{self.openers[opener]}{subject} {self.predicates[predicate]}.{self.codas[coda]}"
+
+        prompt_tokens = sum(len(m['content'].split()) for m in messages or [])
+        completion_tokens = len(content.split())
+        return {
+            'choices': [{'message': {'role': 'assistant', 'content': content}}],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        }
+
+
+class StubOpenAI:
+    """Module-shaped replacement for openai"""
+
+    def __init__(self, chat_completion):
+        self.ChatCompletion = chat_completion
+        self.api_key = "simulated"
+
+
+class StubTwitterClient:
+    """Replacement for tweepy.Client with a rolling daily post quota"""
+
+    def __init__(self, clock, faults, rng, daily_quota=50):
+        self.clock = clock
+        self.faults = faults
+        self.rng = rng
+        self.daily_quota = daily_quota
+        self.window_start = clock.now()
+        self.window_posts = 0
+        self.posted = []  # (timestamp, text)
+        self.calls = {'get_me': 0, 'create_tweet': 0, 'get_tweets': 0}
+        self.errors = {}
+
+    def get_me(self):
+        self.calls['get_me'] += 1
+        self._check()
+        self._roll_window()
+        return SimpleNamespace(
+            data=SimpleNamespace(username="simulated"),
+            rate_limit=SimpleNamespace(
+                remaining=self.daily_quota - self.window_posts,
+                reset=self.window_start + timedelta(days=1)
+            )
+        )
+
+    def create_tweet(self, text):
+        self.calls['create_tweet'] += 1
+        self._check()
+        self._roll_window()
+        if self.window_posts >= self.daily_quota:
+            self._fail(429)
+        self.window_posts += 1
+        self.posted.append((self.clock.now(), text))
+        return SimpleNamespace(data={'id': str(len(self.posted)), 'text': text})
+
+    def get_tweets(self, ids, tweet_fields=None):
+        self.calls['get_tweets'] += 1
+        self._check()
+        return SimpleNamespace(data=[
+            SimpleNamespace(id=tweet_id, public_metrics={
+                'like_count': self.rng.randint(0, 40),
+                'retweet_count': self.rng.randint(0, 8),
+                'reply_count': self.rng.randint(0, 5),
+                'quote_count': self.rng.randint(0, 2),
+                'impression_count': self.rng.randint(100, 2000)
+            })
+            for tweet_id in ids
+        ])
+
+    def _roll_window(self):
+        if self.clock.now() >= self.window_start + timedelta(days=1):
+            self.window_start = self.clock.now()
+            self.window_posts = 0
+
+    def _check(self):
+        if self.faults.active('twitter', self.clock.now()):
+            self._fail(503)
+
+    def _fail(self, status_code):
+        self.errors[status_code] = self.errors.get(status_code, 0) + 1
+        raise SimulatedHTTPError(status_code)
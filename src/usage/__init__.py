@@ -0,0 +1,3 @@
+from .ledger import UsageLedger
+
+__all__ = ['UsageLedger']
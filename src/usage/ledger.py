@@ -0,0 +1,101 @@
+from collections import deque
+from typing import Dict, Optional
+
+# Degradation levels, from cheapest to most expensive behaviour
+NORMAL = 'normal'  # Everything enabled
+REDUCED = 'reduced'  # Skip the OpenAI health probe
+MINIMAL = 'minimal'  # Skip the probe and generate a single candidate per cycle
+
+
+def _empty_usage() -> Dict:
+    return {'prompt_tokens': 0, 'completion_tokens': 0, 'calls': 0}
+
+
+def _add_usage(target: Dict, prompt_tokens: int, completion_tokens: int) -> None:
+    target['prompt_tokens'] += prompt_tokens
+    target['completion_tokens'] += completion_tokens
+    target['calls'] += 1
+
+
+class UsageLedger:
+    """OpenAI token usage per call site, per posted tweet, per day and per persona"""
+
+    def __init__(self, daily_budget: Optional[int] = None, soft_limit: float = 0.8,
+                 keep_days: int = 30, keep_posts: int = 100):
+        self.daily_budget = daily_budget  # Total tokens per day; None disables the governor
+        self.soft_limit = soft_limit  # Fraction of the budget where degradation starts
+        self.keep_days = keep_days
+        self.days = {}  # ISO date -> {'total', 'by_site', 'by_persona', 'posts'}
+        self.pending = {'total': _empty_usage(), 'by_site': {}}  # Spent since the last post
+        self.post_costs = deque(maxlen=keep_posts)
+
+    def record(self, call_site: str, usage: Optional[Dict], day: str, persona: Optional[str] = None) -> None:
+        """Record the usage block of one ChatCompletion response"""
+        usage = usage or {}
+        prompt_tokens = int(usage.get('prompt_tokens') or 0)
+        completion_tokens = int(usage.get('completion_tokens') or 0)
+
+        entry = self._day(day)
+        _add_usage(entry['total'], prompt_tokens, completion_tokens)
+        _add_usage(entry['by_site'].setdefault(call_site, _empty_usage()), prompt_tokens, completion_tokens)
+        _add_usage(entry['by_persona'].setdefault(persona or 'none', _empty_usage()),
+                   prompt_tokens, completion_tokens)
+
+        _add_usage(self.pending['total'], prompt_tokens, completion_tokens)
+        _add_usage(self.pending['by_site'].setdefault(call_site, _empty_usage()),
+                   prompt_tokens, completion_tokens)
+
+    def record_post(self, day: str) -> Dict:
+        """Charge everything spent since the previous post to the tweet just posted"""
+        cost = dict(self.pending['total'], day=day, by_site=self.pending['by_site'])
+        self.post_costs.append(cost)
+        self._day(day)['posts'] += 1
+        self.pending = {'total': _empty_usage(), 'by_site': {}}
+        return cost
+
+    def tokens_used(self, day: str) -> int:
+        total = self.days.get(day, {}).get('total', _empty_usage())
+        return total['prompt_tokens'] + total['completion_tokens']
+
+    def degradation(self, day: str) -> str:
+        if not self.daily_budget:
+            return NORMAL
+        used = self.tokens_used(day)
+        if used >= self.daily_budget:
+            return MINIMAL
+        if used >= self.daily_budget * self.soft_limit:
+            return REDUCED
+        return NORMAL
+
+    def summary(self, day: str) -> Dict:
+        entry = self.days.get(day)
+        posts = entry['posts'] if entry else 0
+        used = self.tokens_used(day)
+        return {
+            'day': day,
+            'tokens': used,
+            'budget': self.daily_budget,
+            'posts': posts,
+            'tokens_per_post': used / posts if posts else None,
+            'degradation': self.degradation(day)
+        }
+
+    def to_dict(self) -> Dict:
+        return {'days': self.days, 'pending': self.pending, 'post_costs': list(self.post_costs)}
+
+    def load_dict(self, data: Dict) -> None:
+        self.days = data.get('days', {})
+        self.pending = data.get('pending', self.pending)
+        self.post_costs.extend(data.get('post_costs', []))
+        self._prune()
+
+    def _day(self, day: str) -> Dict:
+        if day not in self.days:
+            self.days[day] = {'total': _empty_usage(), 'by_site': {}, 'by_persona': {}, 'posts': 0}
+            self._prune()
+        return self.days[day]
+
+    def _prune(self) -> None:
+        # ISO dates sort chronologically
+        for day in sorted(self.days)[:max(0, len(self.days) - self.keep_days)]:
+            del self.days[day]
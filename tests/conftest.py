@@ -0,0 +1,40 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SECRETS = ('API_KEY', 'API_SECRET', 'ACCESS_TOKEN', 'ACCESS_SECRET', 'BEARER_TOKEN', 'OPENAI_API_KEY')
+
+
+@pytest.fixture
+def autotweet(monkeypatch, tmp_path):
+    """autotweet wired to the simulation stubs, a virtual clock and files under tmp_path"""
+    for name in SECRETS:
+        monkeypatch.setenv(name, 'test')
+    monkeypatch.chdir(tmp_path)
+    import autotweet
+    from src.coordination.posting_lease import PostingLease
+    from src.models.model_router import ModelRouter
+    from src.simulation.clock import VirtualClock
+    from src.simulation.stubs import FaultSchedule, StubChatCompletion, StubOpenAI, StubTwitterClient
+    from src.usage.ledger import UsageLedger
+
+    clock = VirtualClock()
+    faults = FaultSchedule(clock.now())
+    rng = random.Random(0)
+    twitter = StubTwitterClient(clock, faults, rng)
+    config = dict(autotweet.CONFIG, state_file=str(tmp_path / 'state.json'),
+                  failed_tweets_log=str(tmp_path / 'failed_tweets.log'))
+
+    monkeypatch.setattr(autotweet, 'CONFIG', config)
+    monkeypatch.setattr(autotweet, 'clock', clock)
+    monkeypatch.setattr(autotweet, 'client', twitter)
+    monkeypatch.setattr(autotweet, 'read_client', twitter)
+    monkeypatch.setattr(autotweet, 'openai', StubOpenAI(StubChatCompletion(clock, faults, rng)))
+    monkeypatch.setattr(autotweet, 'ledger', UsageLedger())
+    monkeypatch.setattr(autotweet, 'router', ModelRouter(config['model_tiers']))
+    monkeypatch.setattr(autotweet, 'coordinator', PostingLease(':memory:'))
+    return autotweet
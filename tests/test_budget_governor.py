@@ -0,0 +1,52 @@
+import pytest
+
+from src.usage.ledger import UsageLedger
+
+
+def spend(autotweet, fraction):
+    day = autotweet.clock.now().date().isoformat()
+    autotweet.ledger.record('generation', {'prompt_tokens': int(1000 * fraction)}, day)
+    return day
+
+
+@pytest.fixture
+def budget(autotweet, monkeypatch):
+    monkeypatch.setattr(autotweet, 'ledger', UsageLedger(daily_budget=1000, soft_limit=0.8))
+    return autotweet.openai.ChatCompletion
+
+
+def test_reduced_budget_skips_the_health_probe(autotweet, budget):
+    assert autotweet.ledger.degradation(spend(autotweet, 0.9)) == 'reduced'
+    assert autotweet.health_check()
+    assert budget.calls == 0
+
+
+def test_minimal_budget_drafts_once_without_polish(autotweet, budget):
+    day = spend(autotweet, 1.0)
+    bot = autotweet.AutoTweet()
+    assert bot.generate_tweet()
+    assert budget.calls == 1
+    assert 'polish' not in autotweet.ledger.days[day]['by_site']
+
+    bot.tweet_memory.check_similarity = lambda tweet: True  # Reject every draft
+    with pytest.raises(Exception):
+        bot.generate_tweet()
+    assert budget.calls == 2
+
+
+def test_retried_cycles_are_charged_as_retries(autotweet):
+    bot = autotweet.AutoTweet()
+    day = autotweet.clock.now().date().isoformat()
+    check_similarity = bot.tweet_memory.check_similarity
+    bot.tweet_memory.check_similarity = lambda tweet: True
+    with pytest.raises(Exception):
+        bot.generate_tweet()  # Five rejected drafts: one 'generation', four 'retry'
+
+    bot.tweet_memory.check_similarity = check_similarity
+    bot.generate_tweet()  # As retry_with_backoff would re-run the cycle
+    by_site = autotweet.ledger.days[day]['by_site']
+    assert by_site['generation']['calls'] == 1
+    assert by_site['retry']['calls'] == 5
+
+    bot.generate_tweet()
+    assert by_site['generation']['calls'] == 2
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from src.personality.context_manager import ContextManager
+
+
+def test_engagement_window_evicts_old_tweets():
+    context = ContextManager(engagement_window_days=1)
+    start = datetime(2024, 1, 1)
+    context.add_interaction("old", tweet_id=1, timestamp=start)
+    context.add_interaction("new", tweet_id=2, timestamp=start + timedelta(hours=20))
+    context.record_engagement(1, {'like_count': 10})
+    context.record_engagement(2, {'like_count': 4, 'reply_count': 1})
+
+    metrics = context.get_engagement_metrics(now=start + timedelta(hours=25))
+    assert metrics['tracked_tweets'] == 1
+    assert metrics['totals']['like_count'] == 4
+    assert metrics['average_interactions'] == 5
+
+
+def test_record_engagement_replaces_previous_sample():
+    context = ContextManager()
+    context.track_tweet(1)
+    context.record_engagement(1, {'like_count': 3})
+    context.record_engagement(1, {'like_count': 7})
+    assert context.get_engagement_metrics()['totals']['like_count'] == 7
+    assert context.record_engagement(99, {'like_count': 1}) is False
+
+
+def test_engagement_drop_triggers_mood_change():
+    context = ContextManager(min_engagement_samples=3)
+    start = datetime(2024, 1, 1)
+    for i, likes in enumerate([20, 20, 20, 1]):
+        context.track_tweet(i, start + timedelta(hours=i))
+        context.record_engagement(i, {'like_count': likes}, now=start + timedelta(hours=i + 4))
+    assert context.get_engagement_metrics(now=start + timedelta(hours=7))['trigger_mood_change'] is True
+
+
+def test_young_tweets_are_compared_by_hourly_rate():
+    context = ContextManager(min_engagement_samples=3, min_engagement_age_hours=2)
+    start = datetime(2024, 1, 1)
+    now = start + timedelta(days=1)
+    # Older tweets have had longer to accumulate likes at the same hourly pace
+    for i, age in enumerate([20, 16, 12, 3]):
+        context.track_tweet(i, now - timedelta(hours=age))
+        context.record_engagement(i, {'like_count': 5 * age}, now=now)
+    context.track_tweet(4, now - timedelta(hours=1))
+    context.record_engagement(4, {'like_count': 0}, now=now)
+
+    metrics = context.get_engagement_metrics(now=now)
+    assert metrics['latest_hourly_rate'] == 5
+    assert metrics['trigger_mood_change'] is False
@@ -0,0 +1,61 @@
+import json
+import os
+import tracemalloc
+
+import pytest
+
+from src.profiling.cycle_profiler import CycleProfiler
+
+
+@pytest.fixture(autouse=True)
+def stop_tracemalloc():
+    yield
+    tracemalloc.stop()  # CycleProfiler starts tracing; keep it out of other tests
+
+
+def files(directory, suffix):
+    return sorted(name for name in os.listdir(directory) if name.endswith(suffix))
+
+
+def test_cycle_writes_profile_and_trace(tmp_path):
+    profiler = CycleProfiler(output_dir=str(tmp_path), snapshot_every=0)
+    with profiler.cycle(lambda: {'memory': 3}):
+        with profiler.stage('generate'):
+            pass
+
+    assert len(files(tmp_path, '.prof')) == 1
+    (trace_file,) = files(tmp_path, '.trace.json')
+    with open(tmp_path / trace_file) as f:
+        trace = json.load(f)
+    assert [event['name'] for event in trace['traceEvents']] == ['cycle', 'generate']
+    assert trace['otherData'] == {'cycle': 1, 'sizes': {'memory': 3}}
+    assert files(tmp_path, '.snapshot') == []
+
+
+def test_rotation_and_snapshots(tmp_path):
+    profiler = CycleProfiler(output_dir=str(tmp_path), snapshot_every=2, keep_cycles=3, keep_snapshots=10)
+    for _ in range(5):
+        with profiler.cycle():
+            pass
+
+    prof = files(tmp_path, '.prof')
+    assert len(prof) == 3 and len(files(tmp_path, '.trace.json')) == 3
+    assert prof[0].endswith('cycle-000003.prof')
+    snapshots = files(tmp_path, '.snapshot')
+    assert [name[-len('000002.snapshot'):] for name in snapshots] == ['000002.snapshot', '000004.snapshot']
+
+
+def test_cycle_count_and_snapshot_carry_over_between_runs(tmp_path, monkeypatch):
+    loaded = []
+    load = tracemalloc.Snapshot.load
+    monkeypatch.setattr(tracemalloc.Snapshot, 'load', staticmethod(lambda path: loaded.append(path) or load(path)))
+
+    for _ in range(4):  # One cycle per process, as under --tick
+        profiler = CycleProfiler(output_dir=str(tmp_path), snapshot_every=2)
+        with profiler.cycle():
+            pass
+
+    assert profiler.cycle_count == 4
+    snapshots = files(tmp_path, '.snapshot')
+    assert [name[-len('000002.snapshot'):] for name in snapshots] == ['000002.snapshot', '000004.snapshot']
+    assert loaded == [str(tmp_path / snapshots[0])]
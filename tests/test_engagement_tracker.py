@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from src.personality.context_manager import ContextManager
+from src.personality.engagement_tracker import EngagementTracker
+
+
+class FakeClient:
+    def __init__(self, fail_with=None):
+        self.batches = []
+        self.fail_with = fail_with
+
+    def get_tweets(self, ids, tweet_fields=None):
+        self.batches.append(list(ids))
+        if self.fail_with:
+            raise self.fail_with
+        return SimpleNamespace(data=[
+            SimpleNamespace(id=tweet_id, public_metrics={'like_count': 1}) for tweet_id in ids
+        ])
+
+
+class RateLimited(Exception):
+    response = SimpleNamespace(status_code=429, headers={})
+
+
+def tracked_context(count, now):
+    context = ContextManager()
+    for i in range(count):
+        context.track_tweet(i, now - timedelta(minutes=count - i))
+    return context
+
+
+def test_refresh_batches_ids_and_resumes_from_cursor():
+    now = datetime(2024, 1, 1)
+    context = tracked_context(250, now)
+    client = FakeClient()
+    tracker = EngagementTracker(client, context, max_batches=2, refresh_interval=0)
+
+    tracker.refresh(now)
+    assert [len(batch) for batch in client.batches] == [100, 100]
+    assert tracker.cursor == 200
+
+    metrics = tracker.refresh(now + timedelta(seconds=1))
+    assert [len(batch) for batch in client.batches] == [100, 100, 50]
+    assert tracker.cursor == 0
+    assert len({i for batch in client.batches for i in batch}) == 250
+    assert metrics['sampled_tweets'] == 250
+
+
+def test_rate_limit_defers_next_refresh():
+    now = datetime(2024, 1, 1)
+    client = FakeClient(fail_with=RateLimited())
+    tracker = EngagementTracker(client, tracked_context(5, now), refresh_interval=0, rate_limit_wait=900)
+
+    tracker.refresh(now)
+    tracker.refresh(now + timedelta(minutes=10))
+    assert len(client.batches) == 1
+    tracker.refresh(now + timedelta(minutes=16))
+    assert len(client.batches) == 2
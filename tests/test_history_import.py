@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import tweepy
+
+from src.memory import history_import
+from src.memory.history_import import HistoryImporter
+from src.memory.tweet_memory import TweetMemory
+
+
+class RateLimited(tweepy.TweepyException):
+    response = SimpleNamespace(status_code=429, headers={})
+
+
+class FakeClient:
+    """Three pages of two tweets; the first request for page 'b' is rate limited"""
+
+    pages = {None: ('a', ['t1', 't2']), 'a': ('b', ['t3', 't4']), 'b': (None, ['t5', 't6'])}
+
+    def __init__(self):
+        self.requested = []
+        self.rate_limited = False
+
+    def get_users_tweets(self, user_id, max_results=None, pagination_token=None):
+        self.requested.append(pagination_token)
+        if pagination_token == 'b' and not self.rate_limited:
+            self.rate_limited = True
+            raise RateLimited()
+        next_token, texts = self.pages[pagination_token]
+        return SimpleNamespace(data=[SimpleNamespace(text=text) for text in texts],
+                               meta={'next_token': next_token} if next_token else {})
+
+
+class FakePaginator:
+    def __init__(self, method, *args, pagination_token=None, **kwargs):
+        self.method, self.args, self.kwargs, self.token = method, args, kwargs, pagination_token
+
+    def __iter__(self):
+        token = self.token
+        while True:
+            response = self.method(*self.args, pagination_token=token, **self.kwargs)
+            yield response
+            token = response.meta.get('next_token')
+            if not token:
+                return
+
+
+def test_import_resumes_from_last_token_after_rate_limit(monkeypatch):
+    monkeypatch.setattr(history_import.tweepy, 'Paginator', FakePaginator)
+    client, sleeps, pages = FakeClient(), [], []
+    memory = TweetMemory(max_memory=10)
+    importer = HistoryImporter(client, memory, 42, page_delay=1, rate_limit_wait=900, sleep=sleeps.append)
+
+    assert importer.run(on_page=lambda token, imported: pages.append((token, imported))) is None
+    assert client.requested == [None, 'a', 'b', 'b']
+    assert pages == [('a', 2), ('b', 4), (None, 6)]
+    assert sleeps == [1, 1, 900]
+    assert len(memory) == 6
+
+
+def test_import_continues_count_from_previous_run(monkeypatch):
+    monkeypatch.setattr(history_import.tweepy, 'Paginator', FakePaginator)
+    client, pages = FakeClient(), []
+    client.rate_limited = True
+    importer = HistoryImporter(client, TweetMemory(max_memory=10), 42, sleep=lambda s: None, imported=4)
+
+    assert importer.run(pagination_token='b', on_page=lambda token, imported: pages.append((token, imported))) is None
+    assert client.requested == ['b']
+    assert pages == [(None, 6)]
+
+
+def test_max_pages_returns_resume_token(monkeypatch):
+    monkeypatch.setattr(history_import.tweepy, 'Paginator', FakePaginator)
+    importer = HistoryImporter(FakeClient(), TweetMemory(max_memory=10), 42, sleep=lambda s: None)
+    assert importer.run(max_pages=1) == 'a'
+    assert importer.imported == 2
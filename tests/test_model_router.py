@@ -0,0 +1,37 @@
+from src.models.model_router import ModelRouter
+
+
+def test_fails_over_from_erroring_primary():
+    router = ModelRouter({'draft': ['fast', 'backup']}, min_samples=3, probe_every=100)
+    assert router.candidates('draft') == ['fast', 'backup']
+    for _ in range(3):
+        router.record('fast', 1.0, False)
+    assert router.candidates('draft') == ['backup', 'fast']
+
+
+def test_slow_primary_is_demoted_by_p95():
+    router = ModelRouter({'polish': ['big', 'small']}, max_p95_latency=5, min_samples=3)
+    for latency in [2, 3, 30]:
+        router.record('big', latency, True)
+    assert not router.is_healthy('big')
+    assert router.report()['big']['p50'] == 3
+
+
+def test_unhealthy_model_is_probed_again():
+    router = ModelRouter({'draft': ['a', 'b']}, min_samples=1, probe_every=3)
+    router.record('a', 1.0, False)
+    orders = [router.candidates('draft')[0] for _ in range(3)]
+    assert orders == ['b', 'b', 'a']
+
+
+def test_probe_countdown_survives_save_and_reload():
+    tiers = {'draft': ['primary', 'backup']}
+    router = ModelRouter(tiers, min_samples=1, probe_every=3)
+    router.record('primary', 1.0, False)
+    firsts = []
+    for _ in range(3):  # One draft per --tick run, state saved in between
+        firsts.append(router.candidates('draft')[0])
+        saved = router.to_dict()
+        router = ModelRouter(tiers, min_samples=1, probe_every=3)
+        router.load_dict(saved)
+    assert firsts == ['backup', 'backup', 'primary']
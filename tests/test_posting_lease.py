@@ -0,0 +1,76 @@
+from src.coordination.posting_lease import PostingLease
+
+
+def test_only_one_holder_until_expiry(tmp_path):
+    path = str(tmp_path / "lease.db")
+    first = PostingLease(path, holder="a", ttl=60)
+    second = PostingLease(path, holder="b", ttl=60)
+
+    token = first.acquire(now=1000)
+    assert token == 1
+    assert second.acquire(now=1030) is None
+    assert first.acquire(now=1030) == token  # Renewal keeps the term
+
+    takeover = second.acquire(now=1100)
+    assert takeover == 2
+    assert not first.validate(token, now=1100)
+    assert second.validate(takeover, now=1100)
+
+
+def test_release_hands_over_with_new_token(tmp_path):
+    path = str(tmp_path / "lease.db")
+    first = PostingLease(path, holder="a")
+    second = PostingLease(path, holder="b")
+    first.release(first.acquire(now=0))
+    assert second.acquire(now=1) == 2
+
+
+def test_idempotency_key_recorded_once(tmp_path):
+    lease = PostingLease(str(tmp_path / "lease.db"), holder="a", ttl=60)
+    token = lease.acquire(now=0)
+    assert lease.begin_post("key", token, now=10)
+    lease.complete_post("key", 123)
+    assert lease.already_posted("key")
+    assert lease.last_post_time() == 10
+    assert not lease.begin_post("key", token, now=20)  # Already posted
+    assert not lease.begin_post("other", token, now=100)  # Lease lapsed meanwhile
+    assert lease.last_post_time() == 10
+
+
+def test_pending_post_survives_crash(tmp_path):
+    path = str(tmp_path / "lease.db")
+    crashed = PostingLease(path, holder="a", ttl=60)
+    assert crashed.begin_post("key", crashed.acquire(now=0), now=10)
+    # The process dies before create_tweet returns; a successor sees the slot as used
+    successor = PostingLease(path, holder="b", ttl=60)
+    successor.acquire(now=100)
+    assert successor.already_posted("key")
+    assert successor.last_post_time() == 10
+
+
+def test_abandoned_post_frees_the_slot(tmp_path):
+    lease = PostingLease(str(tmp_path / "lease.db"), holder="a", ttl=60)
+    token = lease.acquire(now=0)
+    assert lease.begin_post("key", token, now=10)
+    lease.abandon_post("key")
+    assert lease.last_post_time() is None
+    assert lease.begin_post("key", token, now=20)
+
+
+def test_drafts_queue_until_posted_or_stale(tmp_path):
+    path = str(tmp_path / "lease.db")
+    generator = PostingLease(path, holder="generator")
+    poster = PostingLease(path, holder="poster")
+    generator.queue_draft("old", "first", "observant", now=0)
+    generator.queue_draft("new", "second", None, now=10)
+    generator.queue_draft("new", "second again", None, now=20)  # Same key is queued once
+    assert poster.queued_drafts() == 2
+    assert poster.next_draft() == ("old", "first", "observant")
+
+    token = poster.acquire(now=30)
+    assert poster.begin_post("old", token, now=30)
+    poster.complete_post("old", 1)
+    assert poster.next_draft() == ("new", "second", None)
+
+    poster.prune_drafts(older_than=15)
+    assert poster.queued_drafts() == 0
@@ -0,0 +1,39 @@
+import random
+from datetime import timedelta
+
+from src.simulation.simulator import run_simulation
+
+
+def test_openai_outage_is_waited_out(autotweet):
+    outage = timedelta(hours=4)
+    report = run_simulation(autotweet, days=3, seed=1, variety=40,
+                            faults=[('openai', timedelta(hours=2), outage)])
+
+    # Every cycle either posts or fails its health check and waits five minutes
+    assert report['failed_cycles'] == 0
+    assert report['retry_seconds'] == 300 * (report['cycles'] - report['posts'])
+    assert 0 < report['retry_seconds'] <= outage.total_seconds()
+    assert report['quota']['openai_failures'] > 0
+
+    assert report['rejections']['duplicate'] > 0
+    assert report['repeated_posts'] == 0
+    assert sum(report['mood_distribution'].values()) == report['posts']
+
+
+def test_simulation_leaves_the_global_rng_alone(autotweet):
+    random.seed(123)
+    expected = random.Random(123).random()
+    run_simulation(autotweet, days=1, seed=7)
+    assert random.random() == expected
+
+
+def test_posted_tweet_keeps_the_mood_it_was_written_in(autotweet, monkeypatch):
+    bot = autotweet.AutoTweet()
+    written_in = bot.personality.current_mood
+    other = next(mood for mood in bot.personality.moods if mood != written_in)
+    monkeypatch.setattr(bot.personality, 'update_mood',
+                        lambda metrics: setattr(bot.personality, 'current_mood', other))
+
+    bot.post_tweet.__wrapped__(bot, retry=False)
+    assert bot.last_tweet_mood == written_in
+    assert bot.personality.current_mood == other
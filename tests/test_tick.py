@@ -0,0 +1,166 @@
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.simulation.stubs import SimulatedHTTPError
+
+
+def test_tick_posts_once_then_waits(autotweet):
+    assert autotweet.tick() == autotweet.EXIT_OK
+    assert len(autotweet.client.posted) == 1
+
+    autotweet.clock.advance(60)
+    assert autotweet.tick() == autotweet.EXIT_OK
+    assert len(autotweet.client.posted) == 1
+
+
+def test_tick_defers_on_server_error_without_retrying(autotweet, monkeypatch):
+    def create_tweet(text):
+        autotweet.client.calls['create_tweet'] += 1
+        raise SimulatedHTTPError(503)
+    monkeypatch.setattr(autotweet.client, 'create_tweet', create_tweet)
+    start = autotweet.clock.now()
+
+    assert autotweet.tick() == autotweet.EXIT_DEFERRED
+    assert autotweet.client.calls['create_tweet'] == 1
+    assert autotweet.clock.now() - start < timedelta(minutes=5)
+
+
+def test_tick_defers_when_quota_low(autotweet):
+    autotweet.client.daily_quota = autotweet.CONFIG['min_tweets_threshold'] - 1
+    assert autotweet.tick() == autotweet.EXIT_DEFERRED
+    assert autotweet.client.posted == []
+
+
+def test_post_due(autotweet):
+    now = autotweet.clock.now()
+    assert autotweet.post_due({}, now)[0] is None
+
+    state = {'last_tweet_time': (now - timedelta(hours=1)).isoformat()}
+    assert autotweet.post_due(state, now)[0] == autotweet.EXIT_OK
+
+    state = {
+        'last_tweet_time': (now - timedelta(hours=4)).isoformat(),
+        'quota': {'tweets_remaining': 1, 'rate_limit_reset_time': (now + timedelta(hours=1)).isoformat()}
+    }
+    assert autotweet.post_due(state, now)[0] == autotweet.EXIT_DEFERRED
+
+
+def test_tick_decides_within_budget_without_building_the_bot(autotweet, monkeypatch):
+    bot = autotweet.AutoTweet()
+    for i in range(autotweet.CONFIG['tweet_memory_size']):
+        bot.tweet_memory.add_digest(i + 1)
+    bot.last_tweet_time = autotweet.clock.now()
+    autotweet.save_state(bot)
+
+    def unexpected():
+        raise AssertionError("tick built clients or the bot before deciding")
+    monkeypatch.setattr(autotweet, 'AutoTweet', unexpected)
+    monkeypatch.setattr(autotweet, 'connect_clients', unexpected)
+    monkeypatch.setattr(autotweet, 'STARTUP_TIME', time.perf_counter())
+
+    assert autotweet.tick() == autotweet.EXIT_OK
+    assert time.perf_counter() - autotweet.STARTUP_TIME < autotweet.CONFIG['tick_startup_budget']
+
+
+def test_quota_low(autotweet):
+    now = autotweet.clock.now()
+    assert not autotweet.quota_low(now)
+    autotweet.CONFIG.update(tweets_remaining=1, rate_limit_reset_time=now + timedelta(hours=1))
+    assert autotweet.quota_low(now)
+    assert not autotweet.quota_low(now + timedelta(hours=2))
+    autotweet.CONFIG['tweets_remaining'] = autotweet.CONFIG['min_tweets_threshold']
+    assert not autotweet.quota_low(now)
+
+
+def test_state_round_trip(autotweet):
+    bot = autotweet.AutoTweet()
+    bot.post_tweet.__wrapped__(bot, retry=False)
+    autotweet.save_state(bot)
+
+    restored = autotweet.AutoTweet()
+    restored.restore_state(autotweet.load_state())
+    assert restored.last_tweet_time == bot.last_tweet_time
+    assert list(restored.tweet_memory.iter_digests()) == list(bot.tweet_memory.iter_digests())
+    assert restored.get_state() == bot.get_state()
+
+
+def test_drafts_from_any_instance_are_posted_by_the_lease_holder(autotweet, monkeypatch, tmp_path):
+    path = str(tmp_path / 'lease.db')
+    monkeypatch.setattr(autotweet, 'coordinator', autotweet.PostingLease(path, holder='this'))
+    other = autotweet.PostingLease(path, holder='other')
+    token = other.acquire(autotweet.clock.now().timestamp())
+
+    # Without the lease this instance still generates, leaving its draft queued
+    assert autotweet.tick() == autotweet.EXIT_DEFERRED
+    assert autotweet.client.posted == []
+    (key, draft, mood) = other.next_draft()
+
+    other.release(token)
+    calls = autotweet.openai.ChatCompletion.calls
+    assert autotweet.tick() == autotweet.EXIT_OK
+    assert [text for _, text in autotweet.client.posted] == [draft]
+    assert autotweet.openai.ChatCompletion.calls == calls + 1  # Health probe only; the draft was reused
+    assert other.already_posted(key) and other.queued_drafts() == 0
+
+
+def test_ambiguous_failure_keeps_the_window_claimed(autotweet, monkeypatch):
+    def create_tweet(text):
+        raise SimulatedHTTPError(502)
+    monkeypatch.setattr(autotweet.client, 'create_tweet', create_tweet)
+
+    assert autotweet.tick() == autotweet.EXIT_DEFERRED
+    assert autotweet.coordinator.last_post_time() is not None
+    assert autotweet.post_due(autotweet.load_state())[0] == autotweet.EXIT_OK  # The 502 may have posted
+
+
+def test_equal_engagement_never_triggers_a_mood_change_across_ticks(autotweet, monkeypatch):
+    def get_tweets(ids, tweet_fields=None):
+        return SimpleNamespace(data=[
+            SimpleNamespace(id=tweet_id, public_metrics={'like_count': 20}) for tweet_id in ids
+        ])
+    monkeypatch.setattr(autotweet.read_client, 'get_tweets', get_tweets)
+    triggers = []
+    update_mood = autotweet.PersonalityManager.update_mood
+    monkeypatch.setattr(autotweet.PersonalityManager, 'update_mood', lambda self, metrics: (
+        triggers.append(metrics['trigger_mood_change']), update_mood(self, metrics))[1])
+
+    for _ in range(20):
+        assert autotweet.tick() == autotweet.EXIT_OK
+        autotweet.clock.advance(autotweet.CONFIG['sleep_duration'] + 60)
+
+    bot = autotweet.AutoTweet()
+    bot.restore_state(autotweet.load_state())
+    metrics = bot.context.get_engagement_metrics(autotweet.clock.now())
+    assert metrics['sampled_tweets'] >= 3 and metrics['latest_hourly_rate'] is not None
+    assert not any(triggers) and not metrics['trigger_mood_change']
+
+
+def test_hanging_model_times_out_and_fails_over(autotweet):
+    autotweet.openai.ChatCompletion.latency = {'gpt-3.5-turbo': 600.0}
+    start = autotweet.clock.now()
+
+    assert autotweet.tick() == autotweet.EXIT_OK
+    limit = 2 * autotweet.CONFIG['model_max_p95_latency']
+    assert autotweet.router.stats['gpt-3.5-turbo'].outcomes.count(False) >= 1
+    assert autotweet.clock.now() - start < timedelta(seconds=3 * limit + 60)
+
+
+def test_empty_model_tier_is_rejected(autotweet, monkeypatch):
+    monkeypatch.setenv('MODEL_TIER_DRAFT', ' , ')
+    with pytest.raises(EnvironmentError):
+        autotweet.model_tier('draft', 'gpt-3.5-turbo')
+
+
+def test_ambiguous_failure_is_not_retried(autotweet, monkeypatch):
+    def create_tweet(text):
+        autotweet.client.calls['create_tweet'] += 1
+        raise SimulatedHTTPError(502)
+    monkeypatch.setattr(autotweet.client, 'create_tweet', create_tweet)
+    bot = autotweet.AutoTweet()
+
+    assert bot.post_tweet.__wrapped__(bot, retry=True) is None
+    assert autotweet.client.calls['create_tweet'] == 1
+    assert autotweet.clock.slept.get('retry', 0) == 0
@@ -0,0 +1,47 @@
+from src.memory.tweet_memory import TweetMemory, normalize_tweet
+
+
+def test_normalization_catches_case_width_and_whitespace():
+    memory = TweetMemory()
+    memory.add_tweet("Time  is a\tglitch")
+    assert memory.check_similarity("TIME is a glitch")
+    assert memory.check_similarity("Ｔｉｍｅ is a glitch")
+    assert not memory.check_similarity("Time is a loop")
+    assert normalize_tweet(" Straße ") == "strasse"
+
+
+def test_ring_evicts_oldest_digest():
+    memory = TweetMemory(max_memory=3)
+    for tweet in ["a", "b", "c", "d"]:
+        memory.add_tweet(tweet)
+    assert len(memory) == 3
+    assert not memory.check_similarity("a")
+    assert all(memory.check_similarity(t) for t in ["b", "c", "d"])
+    assert list(memory.iter_tweets()) == ["b", "c", "d"]
+
+
+def test_readding_does_not_double_count():
+    memory = TweetMemory(max_memory=2, store_text=False)
+    memory.add_tweet("a")
+    memory.add_tweet("A")
+    memory.add_tweet("b")
+    assert len(memory) == 2
+    assert list(memory.iter_tweets()) == []
+
+    restored = TweetMemory(max_memory=2)
+    for digest in memory.iter_digests():
+        restored.add_digest(digest)
+    assert restored.check_similarity("a") and restored.check_similarity("b")
+    restored.add_tweet("c")  # Text stays aligned with the ring after a digest-only restore
+    assert list(restored.iter_tweets()) == [None, "c"]
+
+
+def test_table_survives_heavy_eviction():
+    memory = TweetMemory(max_memory=64)
+    for digest in range(1, 10001):
+        memory.add_digest(digest * 0x9E3779B97F4A7C15 % 2**64)
+    recent = [digest * 0x9E3779B97F4A7C15 % 2**64 for digest in range(9937, 10001)]
+    assert list(memory.iter_digests()) == recent
+    assert sorted(key for key in memory.table if key) == sorted(recent)
+    for digest in recent:
+        assert memory.table[memory._slot(digest)] == digest
@@ -0,0 +1,28 @@
+from src.usage.ledger import UsageLedger
+
+
+def test_post_cost_includes_rejected_drafts():
+    ledger = UsageLedger()
+    ledger.record('generation', {'prompt_tokens': 100, 'completion_tokens': 20}, '2024-01-01', persona='observant')
+    ledger.record('retry', {'prompt_tokens': 100, 'completion_tokens': 20}, '2024-01-01', persona='observant')
+    cost = ledger.record_post('2024-01-01')
+    assert cost['prompt_tokens'] == 200 and cost['calls'] == 2
+    assert ledger.summary('2024-01-01')['tokens_per_post'] == 240
+    assert ledger.days['2024-01-01']['by_persona']['observant']['calls'] == 2
+
+
+def test_budget_degrades_in_steps():
+    ledger = UsageLedger(daily_budget=100, soft_limit=0.5)
+    assert ledger.degradation('2024-01-01') == 'normal'
+    ledger.record('generation', {'prompt_tokens': 40, 'completion_tokens': 10}, '2024-01-01')
+    assert ledger.degradation('2024-01-01') == 'reduced'
+    ledger.record('generation', {'prompt_tokens': 40, 'completion_tokens': 10}, '2024-01-01')
+    assert ledger.degradation('2024-01-01') == 'minimal'
+    assert ledger.degradation('2024-01-02') == 'normal'
+
+
+def test_old_days_are_pruned():
+    ledger = UsageLedger(keep_days=2)
+    for day in ['2024-01-01', '2024-01-02', '2024-01-03']:
+        ledger.record('generation', {'prompt_tokens': 1}, day)
+    assert sorted(ledger.days) == ['2024-01-02', '2024-01-03']